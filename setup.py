@@ -20,7 +20,8 @@ install_requires = [
     # require at least requests==2.6.1 due to cachecontrol's bug:
     # https://github.com/ionrock/cachecontrol/issues/137
     "requests>=2.6.1",
-    "packaging",
+    # Version segment properties (epoch, release, pre, post, dev, local)
+    "packaging>=19.0",
     # to properly resolve to the right supported cachecontrol version, use latest pip on Python 3.6
     # can be achieved by creating virtualenv directly by virtualenv-3.6 command or upgrading pip in the virtualenv
     "cachecontrol[filecache]",
@@ -15,6 +15,15 @@ try:
 except ImportError:
     pass
 
+# orjson encodes JSON in C, much faster than json for the large readme payloads
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
 from lastversion.__about__ import __self__
 from lastversion import check_version, latest
 from lastversion.argparse_version import VersionAction
@@ -87,6 +96,12 @@ def main(argv=None):
         action="store_true",
         help="Include only formally tagged versions",
     )
+    parser.add_argument(
+        "--thorough",
+        dest="thorough",
+        action="store_true",
+        help="Look at all tags even when a recent formal release is found",
+    )
     parser.add_argument(
         "--sem",
         dest="sem",
@@ -207,6 +222,15 @@ def main(argv=None):
         action="store_true",
         help="Do not use cache for HTTP requests",
     )
+    parser.add_argument(
+        "--cache-ttl",
+        dest="cache_ttl",
+        type=int,
+        default=0,
+        metavar="SECONDS",
+        help="Reuse cached HTTP responses for this many seconds without "
+        "checking with the server",
+    )
     parser.add_argument("--version", action=VersionAction)
     parser.set_defaults(
         validate=True,
@@ -214,6 +238,7 @@ def main(argv=None):
         format="version",
         pre=False,
         formal=False,
+        thorough=False,
         assets=False,
         newer_than=False,
         filter=False,
@@ -227,6 +252,7 @@ def main(argv=None):
     args = parser.parse_args(argv)
 
     BaseProjectHolder.CACHE_DISABLED = args.no_cache
+    BaseProjectHolder.CACHE_TTL = args.cache_ttl
 
     if args.repo == "self":
         args.repo = __self__
@@ -292,8 +318,8 @@ def main(argv=None):
             return sys.exit(0)
 
     if args.action == "install":
-        # we can only install assets
-        args.format = "json"
+        # we can only install assets; dict output keeps the version as Version
+        args.format = "dict"
         if args.having_asset is None:
             args.having_asset = r"~\.(AppImage|rpm)$"
             try:
@@ -347,6 +373,10 @@ def main(argv=None):
             exclude=args.exclude,
             even=args.even,
             formal=args.formal,
+            thorough=args.thorough,
+            # only the printed JSON shows these, update-spec and install do not need them
+            include_license=args.action == "get",
+            include_readme=args.action == "get",
         )
     except (ApiCredentialsError, BadProjectError) as error:
         log.critical(str(error))
@@ -392,7 +422,19 @@ def main(argv=None):
         if args.format == "assets":
             print("\n".join(res))
         elif args.format == "json":
-            json.dump(res, sys.stdout)
+            # compact UTF-8 either way, so the output is the same without orjson
+            if ORJSON_AVAILABLE:
+                output = orjson.dumps(res, option=orjson.OPT_NON_STR_KEYS)
+            else:
+                output = json.dumps(
+                    res, separators=(",", ":"), ensure_ascii=False
+                ).encode("utf-8")
+            stdout_buffer = getattr(sys.stdout, "buffer", None)
+            if stdout_buffer:
+                sys.stdout.flush()
+                stdout_buffer.write(output)
+            else:
+                sys.stdout.write(output.decode("utf-8"))
         else:
             # result may be a tag str, not just Version
             if isinstance(res, Version):
@@ -11,29 +11,46 @@ lastversion.has_update(repo='mautic/mautic', current_version='1.2.3')
 """
 
 import argparse
+import copy
+import hashlib
 import logging
+import marshal
 import os
 import re
 import shlex
 import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from functools import lru_cache
 from os.path import expanduser
 from pathlib import Path
+from string import digits
 from urllib.parse import urlparse
 
-import yaml
 from packaging.version import InvalidVersion
 
+from lastversion.repo_holders.base import BaseProjectHolder
 from lastversion.repo_holders.test import TestProjectHolder
 from lastversion.holder_factory import HolderFactory
-from lastversion.version import Version
+from lastversion.version import Version, make_version
 from lastversion.spdx_id_to_rpmspec import rpmspec_licenses
 from lastversion.utils import (
     download_file,
     rpm_installed_version,
     extract_appimage_desktop_file,
+    ensure_directory_exists,
+    get_cache_dir,
+    load_yaml,
 )
 
 log = logging.getLogger(__name__)
+spec_version_line_regex = re.compile(r"^Version:(\s+)(\S+)")
+spec_release_line_regex = re.compile(r"^Release:(\s+)(\S+)")
+# results of latest() are reused for repeat calls within this many seconds
+LATEST_RESULTS_TTL = 60
+LATEST_RESULTS_MAX = 256
+latest_results = {}
 FAILS_SEM_ERR_FMT = (
     "Latest version %s fails semantic %s constraint against current version %s"
 )
@@ -118,7 +135,7 @@ def get_repo_data_from_spec(rpmspec_filename):
             sys.exit(1)
         try:
             if current_version != "x":
-                repo_data["current_version"] = Version(current_version)
+                repo_data["current_version"] = make_version(current_version)
         except InvalidVersion:
             log.critical(
                 "Failed to parse current version in %s. Tried %s",
@@ -154,21 +171,76 @@ def get_repo_data_from_spec(rpmspec_filename):
         return repo_data
 
 
+def get_yml_cache_filename(repo):
+    """Get filename of the cached copy of the data in YAML file `repo`."""
+    key = hashlib.sha256(os.path.abspath(repo).encode("utf-8")).hexdigest()
+    return os.path.join(get_cache_dir(), "yml", f"{key}.marshal")
+
+
 def get_repo_data_from_yml(repo):
-    """Get repo data from YAML file."""
-    with open(repo) as fpi:
-        repo_data = yaml.safe_load(fpi)
-        if "repo" in repo_data:
-            if "nginx-extras" in repo:
-                repo_data["module_of"] = "nginx"
-            name = os.path.splitext(os.path.basename(repo))[0]
-            if "module_of" in repo_data:
-                name = f'{repo_data["module_of"]}-module-{name}'
-            repo_data["name"] = name
+    """
+    Get repo data from YAML file.
+    Parsed data is kept in the cache directory and reused for as long
+    as the YAML file is not modified, see `load_yml_file`.
+    Within a process, the data is also kept in memory until the file changes.
+    """
+    mtime_ns = os.stat(repo).st_mtime_ns
+    return copy.deepcopy(
+        read_repo_data_from_yml(repo, os.path.abspath(repo), mtime_ns)
+    )
+
+
+@lru_cache(maxsize=256)
+def read_repo_data_from_yml(repo, abs_repo, mtime_ns):
+    """
+    Read repo data from YAML file `repo` as given by the caller.
+    Its absolute path and `mtime_ns` key the in-memory cache.
+    """
+    repo_data = load_yml_file(abs_repo)
+    # these depend on the path as given, so they are not part of the cached data
+    if "repo" in repo_data:
+        if "nginx-extras" in repo:
+            repo_data["module_of"] = "nginx"
+        name = os.path.splitext(os.path.basename(repo))[0]
+        if "module_of" in repo_data:
+            name = f'{repo_data["module_of"]}-module-{name}'
+        repo_data["name"] = name
     return repo_data
 
 
-def latest(
+def load_yml_file(abs_repo):
+    """
+    Load the data of YAML file `abs_repo` as is.
+    A marshal copy is kept in the cache directory, because it loads much faster.
+    Unlike JSON, marshal keeps non-string keys as they are. Data it cannot
+    hold, like dates, is not cached.
+    """
+    cache_filename = None
+    if not BaseProjectHolder.CACHE_DISABLED:
+        cache_filename = get_yml_cache_filename(abs_repo)
+        try:
+            if os.path.getmtime(cache_filename) >= os.path.getmtime(abs_repo):
+                with open(cache_filename, "rb") as reader:
+                    return marshal.load(reader)
+        except (IOError, OSError, EOFError, TypeError, ValueError):
+            pass
+
+    with open(abs_repo) as fpi:
+        data = load_yaml(fpi)
+
+    if cache_filename:
+        try:
+            # serialize first, so that unsupported data does not leave a partial file
+            contents = marshal.dumps(data)
+            ensure_directory_exists(os.path.dirname(cache_filename))
+            with open(cache_filename, "wb") as writer:
+                writer.write(contents)
+        except (IOError, OSError, ValueError) as e:
+            log.info("Not caching parsed %s: %s", abs_repo, e)
+    return data
+
+
+def _latest(
     repo,
     output_format="version",
     pre_ok=False,
@@ -181,49 +253,11 @@ def latest(
     exclude=None,
     even=False,
     formal=False,
+    thorough=False,
+    include_license=True,
+    include_readme=True,
 ):
-    r"""Find the latest release version for a project.
-
-    Args:
-        major (str): Only consider versions which are "descendants" of this
-          major version string
-        short_urls (bool): Whether we should try to return shorter URLs for
-          release data
-        assets_filter (Union[str, Pattern]): Regular expression for filtering
-          assets for the latest release
-        only (str): Only consider tags with this text. Useful for repos with multiple projects.
-                    The argument supports negation and regular expressions. To indicate a regex,
-                    start it with tilde sign, to negate the expression, start it with exclamation
-                    point. See `Examples`.
-        repo (str): Repository specifier in any form.
-        output_format (str): Affects the return format. Possible values `version`, `json`, `dict`,
-                             `assets`, `source`, `tag`.
-        pre_ok (bool): Specifies whether pre-releases can be accepted as a newer version.
-        at (str): Specifies repo hosting more precisely, only useful if repo argument was
-                  specified as one word.
-        having_asset (Union[str, bool]): Only consider releases with the given asset.
-                                         Pass `True` for any asset
-        exclude (str): Only consider releases NOT containing this text/regular expression.
-        even (bool): Consider as stable only releases with even minor component, e.g. 1.2.3
-        formal (bool): Consider as stable only releases with formal tags set up in Web UI
-
-    Examples:
-        Find the latest version of Mautic, it is OK to consider betas.
-
-        >>> latest("mautic/mautic", output_format='version', pre_ok=True)
-        <Version('4.4.4')>
-
-        Consider only tags without letters:
-
-        >>> latest("openssl/openssl", output_format='version', only=r'!~\w')
-        <Version('3.0.7')>
-
-    Returns:
-        Union[Version, dict]: Newer version object, if found and `output_format` is `version`.
-    Returns:
-        str: Single string containing tag, if found and `output_format` is `tag`
-
-    """
+    """Find the latest release version for a project, see `latest`."""
     repo_data = {}
 
     # noinspection HttpUrlsUsage
@@ -245,16 +279,26 @@ def latest(
         project.set_having_asset(repo_data.get("having_asset", having_asset))
         project.set_even(even)
         project.set_formal(formal)
+        project.set_thorough(thorough)
         release = project.get_latest(pre_ok=pre_ok, major=repo_data.get("major", major))
 
         # bail out, found nothing that looks like a release
         if not release:
             return None
 
-        from_type = f"Located the latest release tag {release['tag_name']} at: {project.get_canonical_link()}"
         if "type" in release:
-            from_type = f"{from_type} via {release['type']} mechanism"
-        log.info(from_type)
+            log.info(
+                "Located the latest release tag %s at: %s via %s mechanism",
+                release["tag_name"],
+                project.get_canonical_link(),
+                release["type"],
+            )
+        else:
+            log.info(
+                "Located the latest release tag %s at: %s",
+                release["tag_name"],
+                project.get_canonical_link(),
+            )
 
         version = release["version"]
         tag = release["tag_name"]
@@ -272,25 +316,32 @@ def latest(
                     release["tag_date"] = str(release["tag_date"])
             release["v_prefix"] = tag.startswith("v")
             version_macro = (
-                "upstream_version" if "module_of" in repo_data else "version"
+                "%{upstream_version}" if "module_of" in repo_data else "%{version}"
             )
-            version_macro = f"%{{{version_macro}}}"
             holder_i = {value: key for key, value in HolderFactory.HOLDERS.items()}
             release["source"] = holder_i[type(project)]
-            release["spec_tag"] = tag.replace(str(version), version_macro)
+            spec_tag = tag.replace(str(version), version_macro)
+            release["spec_tag"] = spec_tag
             # spec_tag_no_prefix is the helpful macro that will allow us to know where tarball
             # extracts to (GitHub-specific)
-            if release["spec_tag"].startswith(f"v{version_macro}") or re.match(
-                r"^v\d", release["spec_tag"]
+            if spec_tag[:1] == "v" and (
+                spec_tag.startswith(version_macro, 1) or spec_tag[1:2].isdigit()
             ):
-                release["spec_tag_no_prefix"] = release["spec_tag"].lstrip("v")
+                release["spec_tag_no_prefix"] = spec_tag.lstrip("v")
             else:
-                release["spec_tag_no_prefix"] = release["spec_tag"]
+                release["spec_tag_no_prefix"] = spec_tag
             release["tag_name"] = tag
-            if hasattr(project, "repo_license"):
-                release["license"] = project.repo_license(tag)
-            if hasattr(project, "repo_readme"):
-                release["readme"] = project.repo_readme(tag)
+            # license and readme are separate API requests, make them concurrently
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                license_future = readme_future = None
+                if include_license and hasattr(project, "repo_license"):
+                    license_future = executor.submit(project.repo_license, tag)
+                if include_readme and hasattr(project, "repo_readme"):
+                    readme_future = executor.submit(project.repo_readme, tag)
+                if license_future:
+                    release["license"] = license_future.result()
+                if readme_future:
+                    release["readme"] = readme_future.result()
             release.update(repo_data)
             try:
                 release["assets"] = project.get_assets(
@@ -324,12 +375,118 @@ def latest(
     return None
 
 
+def latest(
+    repo,
+    output_format="version",
+    pre_ok=False,
+    assets_filter=None,
+    short_urls=False,
+    major=None,
+    only=None,
+    at=None,
+    having_asset=None,
+    exclude=None,
+    even=False,
+    formal=False,
+    thorough=False,
+    include_license=True,
+    include_readme=True,
+):
+    r"""Find the latest release version for a project.
+    Repeat calls with the same arguments reuse the result for `LATEST_RESULTS_TTL`
+    seconds (or the cache TTL, if longer), unless caching is disabled or
+    the `LASTVERSION_NO_MEMO` environment variable is set. Each call gets its own
+    copy of the result. Results for `.yml` and `.spec` files are never reused.
+
+    Args:
+        major (str): Only consider versions which are "descendants" of this
+          major version string
+        short_urls (bool): Whether we should try to return shorter URLs for
+          release data
+        assets_filter (Union[str, Pattern]): Regular expression for filtering
+          assets for the latest release
+        only (str): Only consider tags with this text. Useful for repos with multiple projects.
+                    The argument supports negation and regular expressions. To indicate a regex,
+                    start it with tilde sign, to negate the expression, start it with exclamation
+                    point. See `Examples`.
+        repo (str): Repository specifier in any form.
+        output_format (str): Affects the return format. Possible values `version`, `json`, `dict`,
+                             `assets`, `source`, `tag`.
+        pre_ok (bool): Specifies whether pre-releases can be accepted as a newer version.
+        at (str): Specifies repo hosting more precisely, only useful if repo argument was
+                  specified as one word.
+        having_asset (Union[str, bool]): Only consider releases with the given asset.
+                                         Pass `True` for any asset
+        exclude (str): Only consider releases NOT containing this text/regular expression.
+        even (bool): Consider as stable only releases with even minor component, e.g. 1.2.3
+        formal (bool): Consider as stable only releases with formal tags set up in Web UI
+        thorough (bool): Look at all tags even when a recent formal release was found
+        include_license (bool): Look up license data for `json` and `dict` output
+        include_readme (bool): Look up readme data for `json` and `dict` output
+
+    Examples:
+        Find the latest version of Mautic, it is OK to consider betas.
+
+        >>> latest("mautic/mautic", output_format='version', pre_ok=True)
+        <Version('4.4.4')>
+
+        Consider only tags without letters:
+
+        >>> latest("openssl/openssl", output_format='version', only=r'!~\w')
+        <Version('3.0.7')>
+
+    Returns:
+        Union[Version, dict]: Newer version object, if found and `output_format` is `version`.
+    Returns:
+        str: Single string containing tag, if found and `output_format` is `tag`
+
+    """
+    # responses are trusted for --cache-ttl seconds, so are the results
+    results_ttl = max(LATEST_RESULTS_TTL, BaseProjectHolder.CACHE_TTL)
+    # the results depend on the contents of local files for these, do not reuse
+    memoize = (
+        results_ttl
+        and not BaseProjectHolder.CACHE_DISABLED
+        and not os.environ.get("LASTVERSION_NO_MEMO")
+        and not repo.endswith((".yml", ".spec"))
+    )
+    args = (
+        repo,
+        output_format,
+        pre_ok,
+        assets_filter,
+        short_urls,
+        major,
+        only,
+        at,
+        having_asset,
+        exclude,
+        even,
+        formal,
+        thorough,
+        include_license,
+        include_readme,
+    )
+    if memoize:
+        cached = latest_results.get(args)
+        if cached and time.monotonic() - cached[0] < results_ttl:
+            log.info("Reusing the result found for %s moments ago", repo)
+            return copy.deepcopy(cached[1])
+    res = _latest(*args)
+    if memoize:
+        if len(latest_results) >= LATEST_RESULTS_MAX:
+            latest_results.clear()
+        # the caller is free to change the returned result, keep a copy
+        latest_results[args] = (time.monotonic(), copy.deepcopy(res))
+    return res
+
+
 def has_update(repo, current_version, pre_ok=False, at=None):
     """Given an existing version for a repo, checks if there is an update.
 
     Args:
         repo (str): Repository specifier in any form.
-        current_version (str): A version you want to check update for.
+        current_version (str|Version): A version you want to check update for.
         pre_ok (bool): Specifies whether pre-releases can be accepted as a newer version.
         at (str): Specifies repo hosting more precisely, only useful if repo argument was
                   specified as one word.
@@ -338,8 +495,11 @@ def has_update(repo, current_version, pre_ok=False, at=None):
         Version: Newer version as an object, if found. Otherwise, False
 
     """
+    # parse the version first: invalid input should fail before any API requests
+    if not isinstance(current_version, Version):
+        current_version = make_version(current_version)
     latest_version = latest(repo, output_format="version", pre_ok=pre_ok, at=at)
-    if latest_version and latest_version > Version(current_version):
+    if latest_version and latest_version > current_version:
         return latest_version
     return False
 
@@ -364,11 +524,22 @@ def check_version(value):
     return value
 
 
+@lru_cache(maxsize=None)
+def get_version_parser():
+    """
+    Get the holder used to sanitize free-form version strings.
+    It is created on first use only and shared, as sanitizing does not change it.
+    """
+    return TestProjectHolder()
+
+
+@lru_cache(maxsize=1024)
 def parse_version(tag):
     """
     Parse version to a Version object.
     Argument may not be a version but a URL or a repo name, in which case return False
     E.g., used in lastversion repo-name -gt 1.2.3 (and repo-name is passed here as tag)
+    The result depends on the tag alone, so it is cached (check_version uses it, too).
     """
     # If a URL is passed
     if tag.startswith(("http://", "https://")):
@@ -376,9 +547,7 @@ def parse_version(tag):
     # If a repo name is passed, e.g. "mautic/mautic"
     if "/" in tag and " " not in tag:
         return False
-    h = TestProjectHolder()
-    v = h.sanitize_version(tag, pre_ok=True)
-    return v
+    return get_version_parser().sanitize_version(tag, pre_ok=True)
 
 
 def get_rpm_packager():
@@ -440,12 +609,9 @@ def update_spec(repo, res, sem="minor"):
             elif ln.startswith("Version:") and (
                 "module_of" not in res or not res["module_of"]
             ):
-                version_tag_regex = r"^Version:(\s+)(\S+)"
-                m = re.match(version_tag_regex, ln)
+                m = spec_version_line_regex.match(ln)
                 out.append("Version:" + m.group(1) + str(res["version"]))
             elif ln.startswith("%changelog") and packager:
-                from datetime import datetime
-
                 now = datetime.utcnow()
                 today = now.strftime("%a %b %d %Y")
                 out.append(ln.rstrip())
@@ -453,11 +619,8 @@ def update_spec(repo, res, sem="minor"):
                 out.append(f"- upstream release v{res['version']}")
                 out.append("\n")
             elif ln.startswith("Release:"):
-                release_tag_regex = r"^Release:(\s+)(\S+)"
-                m = re.match(release_tag_regex, ln)
+                m = spec_release_line_regex.match(ln)
                 release = m.group(2)
-                from string import digits
-
                 release = release.lstrip(digits)
                 out.append("Release:" + m.group(1) + "1" + release)
             else:
@@ -502,9 +665,14 @@ def install_rpms(res, rpms, args):
             "Please install lastversion using YUM or DNF so it can check current "
             "program version. This is helpful to prevent unnecessary downloads"
         )
-    if installed_version and Version(installed_version) >= Version(res["version"]):
-        log.warning("Newest version %s is already installed", installed_version)
-        sys.exit(0)
+    if installed_version:
+        latest_version = res["version"]
+        # dict output already has a Version, json output has it as str
+        if not isinstance(latest_version, Version):
+            latest_version = make_version(latest_version)
+        if make_version(installed_version) >= latest_version:
+            log.warning("Newest version %s is already installed", installed_version)
+            sys.exit(0)
     # pass RPM URLs directly to package management program
     try:
         import subprocess
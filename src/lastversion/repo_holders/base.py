@@ -5,16 +5,26 @@ import logging
 import os
 import platform
 import re
+from functools import lru_cache
+from urllib.parse import urlsplit
 
 import datetime
-import feedparser
 import requests
-from appdirs import user_cache_dir
 from cachecontrol import CacheControlAdapter
 from cachecontrol.caches.file_cache import FileCache
+from cachecontrol.heuristics import ExpiresAfter
 from packaging.version import InvalidVersion
 
-from lastversion.version import Version
+SEPARATE_BODY_CACHE_AVAILABLE = False
+try:
+    # a "304 Not Modified" then rewrites only the headers of a cached response
+    from cachecontrol.caches import SeparateBodyFileCache
+
+    SEPARATE_BODY_CACHE_AVAILABLE = True
+except ImportError:
+    pass
+
+from lastversion.version import Version, make_version
 from lastversion.__about__ import __version__
 
 # This class basically corresponds to something (often a website) which holds
@@ -23,7 +33,12 @@ from lastversion.__about__ import __version__
 # information for a project based on its URL or name (see LocalVersionSession)
 # it is instantiated with a particular project in mind/set, but also has some methods for
 # stuff like searching one
-from lastversion.utils import asset_does_not_belong_to_machine, ensure_directory_exists
+from lastversion.utils import (
+    asset_does_not_belong_to_machine,
+    ensure_directory_exists,
+    get_cache_dir,
+    source_archive_ext,
+)
 
 log = logging.getLogger(__name__)
 
@@ -42,13 +57,55 @@ def matches_filter(filter_s, positive, version_s):
     if not filter_s:
         return True
 
-    if filter_s.startswith("!"):
+    negated, regex, text = parse_filter(filter_s)
+    if negated:
         positive = not positive
+    if regex:
+        return positive == bool(regex.search(version_s))
+    return positive == bool(text in version_s)
+
+
+@lru_cache(maxsize=64)
+def parse_filter(filter_s):
+    """
+    Parse a filter string once, as it is applied to every tag of a project.
+
+    Returns:
+        tuple: Whether the filter is negated, the compiled regex (for filters
+            starting with tilde) or None, and the text to look for.
+    """
+    negated = filter_s.startswith("!")
+    if negated:
         filter_s = filter_s[1:]
     if filter_s.startswith("~"):
-        filter_s = re.compile(rf"{filter_s.lstrip('~')}")
-        return positive == bool(re.search(filter_s, version_s))
-    return positive == bool(filter_s in version_s)
+        return negated, re.compile(filter_s.lstrip("~")), None
+    return negated, None, filter_s
+
+
+@lru_cache(maxsize=None)
+def get_cache_adapter(cache_dir, cache_ttl=0):
+    """
+    Get the caching HTTP adapter for a cache directory.
+    Adapters are shared by all holders, so their connection pools are kept
+    alive between `latest()` calls instead of being set up for every project.
+    """
+    heuristic = ExpiresAfter(seconds=cache_ttl) if cache_ttl else None
+    if SEPARATE_BODY_CACHE_AVAILABLE:
+        # kept apart: FileCache entries carry their body inline, and would lose
+        # it when only the headers are rewritten
+        cache = SeparateBodyFileCache(os.path.join(cache_dir, "http"))
+    else:
+        cache = FileCache(cache_dir)
+    return CacheControlAdapter(cache=cache, heuristic=heuristic)
+
+
+@lru_cache(maxsize=None)
+def get_http_adapter():
+    """
+    Get the retrying HTTP adapter used by holders that do not cache.
+    Like the caching adapters, it is shared to keep its connection pool alive.
+    """
+    return requests.adapters.HTTPAdapter(max_retries=5)
 
 
 class BaseProjectHolder(requests.Session):
@@ -91,29 +148,44 @@ class BaseProjectHolder(requests.Session):
     DEFAULT_TIMEOUT = 30  # default timeout in seconds
 
     CACHE_DISABLED = False
+    # Bound for the per-holder memo of sanitize_version results
+    SANITIZED_VERSIONS_MAX = 4096
+    # Seconds for which cached responses are used without revalidation (0 = always revalidate)
+    CACHE_TTL = 0
+
+    # Version-like substrings of a tag that did not parse as a whole
+    version_in_tag_regex = re.compile(r"\d+(?:[.][0-9x]+)+(?:rc\d?)?")
+
+    def close(self):
+        """Close the adapters of this session, except the shared ones."""
+        shared = (self.cache_adapter, get_http_adapter())
+        for adapter in self.adapters.values():
+            if adapter not in shared:
+                adapter.close()
 
     @property
     def name(self):
         """Get project name, useful in URLs for assets, etc."""
         if self.repo:
-            return self.repo.split("/")[-1]
+            return self.repo.rpartition("/")[2]
         return None
 
     def __init__(self, name=None, hostname=None):
         super().__init__()
-        self.mount("https://", requests.adapters.HTTPAdapter(max_retries=5))
+        self.mount("https://", get_http_adapter())
         app_name = __name__.split(".", maxsplit=1)[0]
 
         self.cache_dir = None
         self.cache = None
+        self.cache_adapter = None
         if not self.CACHE_DISABLED:
-            self.cache_dir = user_cache_dir(app_name)
+            self.cache_dir = get_cache_dir()
             log.info("Using cache directory: %s.", self.cache_dir)
-            self.cache = FileCache(self.cache_dir)
-            cache_adapter = CacheControlAdapter(cache=self.cache)
+            self.cache_adapter = get_cache_adapter(self.cache_dir, self.CACHE_TTL)
+            self.cache = self.cache_adapter.cache
             # noinspection HttpUrlsUsage
-            self.mount("http://", cache_adapter)
-            self.mount("https://", cache_adapter)
+            self.mount("http://", self.cache_adapter)
+            self.mount("https://", self.cache_adapter)
         else:
             log.info("Cache is disabled for this holder.")
 
@@ -135,6 +207,9 @@ class BaseProjectHolder(requests.Session):
         self.feed_url = None
         self.even = False
         self.formal = False
+        self.thorough = False
+        # the same tags come from feeds, releases and tags API, sanitize each once
+        self.sanitized_versions = {}
 
     def request(self, *args, **kwargs):
         """Set default timeout for requests."""
@@ -171,10 +246,12 @@ class BaseProjectHolder(requests.Session):
     def set_branches(self, branches):
         """Sets project holder's branches."""
         self.branches = branches
+        self.sanitized_versions.clear()
 
     def set_only(self, only):
         """Sets "only" tag selector for this holder."""
         self.only = only
+        self.sanitized_versions.clear()
         if only:
             log.info('Only considering tags with "%s"', only)
         return self
@@ -182,6 +259,7 @@ class BaseProjectHolder(requests.Session):
     def set_exclude(self, exclude):
         """Sets "exclude" tag selector for this holder."""
         self.exclude = exclude
+        self.sanitized_versions.clear()
         if exclude:
             log.info('Only considering tags without "%s"', exclude)
         return self
@@ -189,6 +267,7 @@ class BaseProjectHolder(requests.Session):
     def set_even(self, even):
         """Set to return only releases with even numbering like 1.2.3."""
         self.even = even
+        self.sanitized_versions.clear()
         if even:
             log.info("Only considering releases with even numbering")
         return self
@@ -200,6 +279,13 @@ class BaseProjectHolder(requests.Session):
             log.info("Only considering formally tagged releases")
         return self
 
+    def set_thorough(self, thorough):
+        """Set to look at all tags even when a recent formal release is found."""
+        self.thorough = thorough
+        if thorough:
+            log.info("Looking at all tags, even past a recent formal release")
+        return self
+
     def set_having_asset(self, having_asset):
         """Sets "having_asset" selector for this holder."""
         self.having_asset = having_asset
@@ -219,12 +305,14 @@ class BaseProjectHolder(requests.Session):
         hostname = None
         # return repo modified to result of extraction
         if cls.is_link(repo):
-            # parse hostname for passing to whatever holder selected
-            url_parts = repo.split("/")
-            hostname = url_parts[2]
-            offset = 3 + cls.REPO_URL_PROJECT_OFFSET
+            # parse hostname for passing to whatever holder selected,
+            # query string and fragment are not part of the project path
+            url = urlsplit(repo)
+            hostname = url.netloc
+            path_parts = url.path.split("/")
+            offset = 1 + cls.REPO_URL_PROJECT_OFFSET
             repo = "/".join(
-                url_parts[offset : offset + cls.REPO_URL_PROJECT_COMPONENTS]
+                path_parts[offset : offset + cls.REPO_URL_PROJECT_COMPONENTS]
             )
         return hostname, repo
 
@@ -293,24 +381,43 @@ class BaseProjectHolder(requests.Session):
 
     def matches_major_filter(self, version, major):
         """Check if version matches major filter."""
+        version_s = str(version)
         if (
             self.branches
             and major in self.branches
-            and re.search(rf"{self.branches[major]}", str(version))
+            and re.search(self.branches[major], version_s)
         ):
             log.info("%s matches major %s", version, self.branches[major])
             return True
-        if str(version).startswith(f"{major}."):
-            log.info("%s is under the desired major %s", version, major)
+        if version_s == major:
             return True
-        if str(version) == major:
+        if version_s.startswith(f"{major}."):
+            log.info("%s is under the desired major %s", version, major)
             return True
         return False
 
+    def is_outside_major_filter(self, version_s, major):
+        """
+        Cheaply check, without parsing, that a version string cannot pass
+        major filter. Only plain numeric strings (no leading zeros) are judged,
+        because those are represented as is after parsing.
+        """
+        if not major or self.branches:
+            return False
+        if version_s == major or version_s.startswith(f"{major}."):
+            return False
+        return all(
+            part.isdigit() and (part[0] != "0" or part == "0")
+            for part in version_s.split(".")
+        )
+
     def remove_prefix(self, version_s):
         """Remove project name prefix from version string."""
-        prefixes = (f"{self.name}-", f"{self.name}_")
-        for prefix in prefixes:
+        name = self.name
+        # most tags do not start with the project name, skip building the prefixes
+        if not name or not version_s.startswith(name):
+            return version_s
+        for prefix in (f"{name}-", f"{name}_"):
             if version_s.startswith(prefix):
                 version_s = version_s[len(prefix) :]
                 log.info(
@@ -324,15 +431,39 @@ class BaseProjectHolder(requests.Session):
     def sanitize_version(self, version_s, pre_ok=False, major=None):
         """
         Extract a version from tag name; that satisfies this holder's filters, etc.
+        Results are remembered until the holder's filters change. The project
+        name prefix is stripped based on the repo, so that is part of the key.
 
         Returns:
             Version or None: The return value can be a Version object or None.
         """
+        key = (self.repo, version_s, pre_ok, major)
+        if key in self.sanitized_versions:
+            return self.sanitized_versions[key]
+        if len(self.sanitized_versions) >= self.SANITIZED_VERSIONS_MAX:
+            self.sanitized_versions.clear()
+        res = self._sanitize_version(version_s, pre_ok, major)
+        self.sanitized_versions[key] = res
+        return res
+
+    def _sanitize_version(self, version_s, pre_ok=False, major=None):
+        """Extract a version from tag name, see `sanitize_version`."""
         log.info("Sanitizing string %s as a satisfying version.", version_s)
 
         # for `libssh2-x.x.x` should remove project name prefix to prevent `2` going into the version
         version_s = self.remove_prefix(version_s)
 
+        # v1.2.3 is the most common tag shape: drop the "v" (Version would strip
+        # it anyway), so plain dotted numbers skip normalization in Version
+        plain_s = version_s
+        if version_s[:1] in ("v", "V") and "0" <= version_s[1:2] <= "9":
+            plain_s = version_s[1:]
+
+        # apply --major filter early to the tags that need no parsing to judge
+        if self.is_outside_major_filter(plain_s, major):
+            log.info("%s is not under the desired major %s", version_s, major)
+            return None
+
         res = None
 
         if not matches_filter(self.only, True, version_s):
@@ -349,9 +480,17 @@ class BaseProjectHolder(requests.Session):
             )
             return None
 
+        # a tag without digits parses only when a status word like "beta" stands
+        # in for the number, anything else (e.g. "stable") can be ruled out now
+        if not any(c.isdigit() for c in version_s):
+            version_s_lower = version_s.lower()
+            if not any(word in version_s_lower for word in Version.part_to_pypi_dict):
+                log.info("No digits nor status words in %s", version_s)
+                return None
+
         try:
             char_fix_required = self.repo in self.LAST_CHAR_FIX_REQUIRED_ON
-            v = Version(version_s, char_fix_required=char_fix_required)
+            v = make_version(plain_s, char_fix_required=char_fix_required)
             if not v.is_prerelease or pre_ok:
                 log.info("Parsed as Version OK. String representation: %s.", v)
                 res = v
@@ -361,13 +500,12 @@ class BaseProjectHolder(requests.Session):
             log.info("Failed to parse %s as Version.", version_s)
             # attempt to remove extraneous chars and revalidate
             # we use findall for cases where "tag" may be 'foo/2.x/2.45'
-            matches = re.findall(re.compile(r"(\d+([.][0-9x]+)+(rc\d?)?)"), version_s)
-            for s in matches:
-                version_s = s[0]
+            matches = self.version_in_tag_regex.findall(version_s)
+            for version_s in matches:
                 log.info("Sanitized tag name value to %s.", version_s)
                 # now we may have gotten a non-version like 2.x, so let's try to parse it
                 try:
-                    res = Version(version_s)
+                    res = make_version(version_s)
                 except InvalidVersion:
                     log.info("Failed to parse %s as Version.", version_s)
                     continue
@@ -383,7 +521,7 @@ class BaseProjectHolder(requests.Session):
                     # gets list except first item, joins by dot
                     version_s = ".".join(parts[1:])
                     try:
-                        v = Version(version_s)
+                        v = make_version(version_s)
                         if not v.is_prerelease or pre_ok:
                             log.info("Parsed as Version OK")
                             log.info("String representation of version is %s.", v)
@@ -413,8 +551,6 @@ class BaseProjectHolder(requests.Session):
         if not self.RELEASE_URL_FORMAT:
             log.warning("Getting release URL for %s is not implemented", self._type())
             return None
-        ext = "zip" if os.name == "nt" else "tar.gz"
-
         fmt = (
             self.SHORT_RELEASE_URL_FORMAT
             if (shorter or "/" in release["tag_name"]) and self.SHORT_RELEASE_URL_FORMAT
@@ -426,12 +562,15 @@ class BaseProjectHolder(requests.Session):
             repo=self.repo,
             name=self.name,
             tag=release["tag_name"],
-            ext=ext,
+            ext=source_archive_ext,
             version=release["version"],
         )
 
     def get_assets(self, release, short_urls, assets_filter=None):
         """Get assets for a given release."""
+        if assets_filter and isinstance(assets_filter, str):
+            # library callers may pass a string, compile it once for all assets
+            assets_filter = re.compile(assets_filter)
         urls = []
         assets = release.get("assets", [])
         arch_matched_assets = []
@@ -444,7 +583,7 @@ class BaseProjectHolder(requests.Session):
 
         if assets:
             for asset in assets:
-                if assets_filter and not re.search(assets_filter, asset["name"]):
+                if assets_filter and not assets_filter.search(asset["name"]):
                     continue
                 if not assets_filter and asset_does_not_belong_to_machine(
                     asset["name"]
@@ -457,7 +596,7 @@ class BaseProjectHolder(requests.Session):
                 urls.append(asset["browser_download_url"])
         else:
             download_url = self.release_download_url(release, short_urls)
-            if not assets_filter or re.search(assets_filter, download_url):
+            if not assets_filter or assets_filter.search(download_url):
                 urls.append(download_url)
         return urls
 
@@ -490,6 +629,9 @@ class BaseProjectHolder(requests.Session):
         To leverage cachecontrol, we fetch the feed using requests as usual,
         then supply its text to feedparser as a raw string
         """
+        # deferred: not every holder reads feeds
+        import feedparser
+
         ret = {}
         log.debug("Requesting %s", url)
         r = self.get(url)
@@ -1,7 +1,7 @@
 """BitBucket repository session."""
-from dateutil import parser
 
 from lastversion.repo_holders.base import BaseProjectHolder
+from lastversion.utils import parse_timestamp
 
 
 class BitBucketRepoSession(BaseProjectHolder):
@@ -36,5 +36,5 @@ class BitBucketRepoSession(BaseProjectHolder):
         version = self.sanitize_version(release["name"], pre_ok, major)
         release["version"] = version
         release["tag_name"] = release["name"]
-        release["tag_date"] = parser.parse(release["created_on"])
+        release["tag_date"] = parse_timestamp(release["created_on"])
         return release
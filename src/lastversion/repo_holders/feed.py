@@ -3,8 +3,6 @@ import datetime
 import logging
 from urllib.parse import urlparse
 
-import feedparser
-
 from lastversion.repo_holders.base import BaseProjectHolder
 
 log = logging.getLogger(__name__)
@@ -29,6 +27,7 @@ class FeedRepoSession(BaseProjectHolder):
         """Find the feed for a given site"""
         # noinspection PyPep8Naming
         from bs4 import BeautifulSoup as bs4
+        import feedparser
 
         raw = self.get(site).text
         result = []
@@ -75,6 +74,8 @@ class FeedRepoSession(BaseProjectHolder):
 
     def get_latest(self, pre_ok=False, major=None):
         """Get the latest release."""
+        import feedparser
+
         ret = {}
         # To leverage `cachecontrol`, we fetch the feed using requests as
         # usual, then feed the feed to feedparser as a raw string e.g.
@@ -7,10 +7,9 @@ import os
 import re
 import time
 
-from bs4 import BeautifulSoup
-from dateutil import parser
 
 from lastversion.repo_holders.base import BaseProjectHolder
+from lastversion.utils import parse_timestamp
 from lastversion.exceptions import ApiCredentialsError, BadProjectError
 
 
@@ -120,8 +119,13 @@ class GiteaRepoSession(BaseProjectHolder):
         log.info("Checking as Gitea project at %s", project_page)
         response = self.get(project_page, timeout=10)
         if response.status_code == 200:
-            # create beautiful soup :)
-            soup = BeautifulSoup(response.text, "html.parser")
+            # deferred: only needed to sniff self-hosted instances
+            from bs4 import BeautifulSoup, SoupStrainer
+
+            # only <link> elements are of interest, skip building the rest of the tree
+            soup = BeautifulSoup(
+                response.text, "html.parser", parse_only=SoupStrainer("link")
+            )
             # If there's <link rel="alternate" type="application/atom+xml" title="" href="/{repo}.atom">, it's a Gitea repo
             if soup.find("link", {"href": f"/{self.repo}.atom"}):
                 return True
@@ -275,7 +279,7 @@ class GiteaRepoSession(BaseProjectHolder):
             version = self.sanitize_version(tag_name, pre_ok, major)
             if not version:
                 continue
-            d = parser.parse(t["commit"]["created"])
+            d = parse_timestamp(t["commit"]["created"])
 
             if not ret or version > ret["version"] or d > ret["tag_date"]:
                 # rare case: if upstream filed formal pre-release that passes as stable
@@ -341,7 +345,7 @@ class GiteaRepoSession(BaseProjectHolder):
                 if not found_asset:
                     log.info("Desired asset not found in the release.")
                     return ret
-        formal_release["tag_date"] = parser.parse(formal_release["published_at"])
+        formal_release["tag_date"] = parse_timestamp(formal_release["published_at"])
         formal_release["version"] = version
         formal_release["type"] = data_type
         log.info(
@@ -9,11 +9,10 @@ from datetime import datetime
 from datetime import timedelta
 from urllib.parse import unquote
 
-import feedparser
-from dateutil import parser
 
 from lastversion.exceptions import ApiCredentialsError, BadProjectError
 from lastversion.repo_holders.base import BaseProjectHolder
+from lastversion.utils import parse_timestamp, response_json
 
 log = logging.getLogger(__name__)
 
@@ -108,6 +107,8 @@ class GitHubRepoSession(BaseProjectHolder):
     """
     RELEASE_URL_FORMAT = "https://{hostname}/{repo}/archive/{tag}/{name}-{tag}.{ext}"
     SHORT_RELEASE_URL_FORMAT = "https://{hostname}/{repo}/archive/{tag}.{ext}"
+    # Days within which a formal release from /releases is trusted without /tags
+    RECENT_FORMAL_RELEASE_DAYS = 30
 
     def api_search_repo(self, name):
         """API search for a repository
@@ -122,7 +123,7 @@ class GitHubRepoSession(BaseProjectHolder):
         )
 
         if r.status_code == 200:
-            data = r.json()
+            data = response_json(r)
             if data["items"]:
                 return data["items"][0]["full_name"]
 
@@ -169,6 +170,10 @@ class GitHubRepoSession(BaseProjectHolder):
         self.feed_contents = {}
         # lazy loaded dict cache of /releases response keyed by tag, only first page
         self.formal_releases_by_tag = None
+        # tags known to have no formal release, so they are not looked up again
+        self.tags_without_release = set()
+        # dict of commit SHA to its committer date, tags often share commits
+        self.commit_dates = {}
         self.rate_limited_count = 0
         self.api_token = None
         self.seen_semver = False
@@ -272,7 +277,7 @@ class GitHubRepoSession(BaseProjectHolder):
         if r.status_code == 200:
             # unfortunately, unlike /readme, API always returns *latest* license, ignoring tag
             # we have to double-check whether the license file exists "at release tag"
-            license_data = r.json()
+            license_data = response_json(r)
             license_path = license_data["path"]
             license_r = self.repo_query(f"/contents/{license_path}?ref={tag}")
             if license_r.status_code == 200:
@@ -283,7 +288,7 @@ class GitHubRepoSession(BaseProjectHolder):
         """API query for a repository's README"""
         r = self.repo_query(f"/readme?ref={tag}")
         if r.status_code == 200:
-            return r.json()
+            return response_json(r)
         return None
 
     def find_in_tags_via_graphql(self, ret, pre_ok, major):
@@ -356,9 +361,9 @@ class GitHubRepoSession(BaseProjectHolder):
         """
         cursor = ""
         log.info("Using graphql queries...")
+        # testing on php/php-src
+        owner, name = self.repo.split("/")
         while True:
-            # testing on php/php-src
-            owner, name = self.repo.split("/")
             query = query_fmt % (owner, name, cursor)
             log.info("Running query %s", query)
             r = self.post(f"{self.api_base}/graphql", json={"query": query})
@@ -366,7 +371,7 @@ class GitHubRepoSession(BaseProjectHolder):
             if r.status_code != 200:
                 log.info("query returned non 200 response code %s", r.status_code)
                 return ret
-            j = r.json()
+            j = response_json(r)
             if "errors" in j and j["errors"][0].get("type") == "NOT_FOUND":
                 raise BadProjectError(f"No such project found on GitHub: {self.repo}")
             if not j["data"]["repository"]["tags"]["edges"]:
@@ -390,7 +395,7 @@ class GitHubRepoSession(BaseProjectHolder):
                     # using commit date because the tag is not annotated
                     d = node["target"]["author"]["date"]
                     log.info("Using commit date %s", d)
-                tag_date = parser.parse(d)
+                tag_date = parse_timestamp(d)
                 if ret and tag_date + timedelta(days=365) < ret["tag_date"]:
                     log.info("The version %s is newer, but is too old!", version)
                     break
@@ -432,20 +437,35 @@ class GitHubRepoSession(BaseProjectHolder):
             self.formal_releases_by_tag = {}
             r = self.repo_query("/releases")
             if r.status_code == 200:
-                for release in r.json():
+                for release in response_json(r):
                     self.formal_releases_by_tag[release["tag_name"]] = release
 
     def get_formal_release_for_tag(self, tag):
         """Get formal release for a given tag, using cache from /releases"""
         self.ensure_formal_releases_fetched()
         # no releases in /releases means no
-        if self.formal_releases_by_tag and tag not in self.formal_releases_by_tag:
+        if (
+            self.formal_releases_by_tag
+            and tag not in self.formal_releases_by_tag
+            and tag not in self.tags_without_release
+        ):
             r = self.repo_query(f"/releases/tags/{tag}")
             if r.status_code == 200:
-                self.formal_releases_by_tag[tag] = r.json()
+                self.formal_releases_by_tag[tag] = response_json(r)
+            elif r.status_code == 404:
+                self.tags_without_release.add(tag)
 
         return self.formal_releases_by_tag.get(tag)
 
+    def get_commit_date(self, sha):
+        """Get committer date of a commit, each commit is requested once."""
+        if sha not in self.commit_dates:
+            c = self.repo_query(f"/git/commits/{sha}")
+            self.commit_dates[sha] = parse_timestamp(
+                response_json(c)["committer"]["date"]
+            )
+        return self.commit_dates[sha]
+
     def find_in_tags(self, ret, pre_ok, major):
         """
         Find a more recent release in the /tags API endpoint.
@@ -461,35 +481,39 @@ class GitHubRepoSession(BaseProjectHolder):
         r = self.repo_query("/tags?per_page=100")
         if r.status_code != 200:
             return None
-        tags = r.json()
+        tags = response_json(r)
         while "next" in r.links.keys():
             r = self.get(r.links["next"]["url"])
-            tags.extend(r.json())
+            tags.extend(response_json(r))
 
         for t in tags:
             tag_name = t["name"]
             version = self.sanitize_version(tag_name, pre_ok, major)
             if not version:
                 continue
-            c = self.repo_query(f'/git/commits/{t["commit"]["sha"]}')
-            d = c.json()["committer"]["date"]
-            d = parser.parse(d)
-
-            if not ret or version > ret["version"] or d > ret["tag_date"]:
-                # rare case: if upstream filed formal pre-release that passes as stable
-                # version (tag is 1.2.3 instead of 1.2.3b) double check if pre-release
-                # TODO handle API failure here as it may result in "false positive"?
-                release_for_tag = self.get_formal_release_for_tag(tag_name)
-                if release_for_tag:
-                    ret = self.set_matching_formal_release(
-                        ret, release_for_tag, version, pre_ok
-                    )
-                else:
-                    ret = t
-                    ret["tag_name"] = tag_name
-                    ret["tag_date"] = d
-                    ret["version"] = version
-                    ret["type"] = "tag"
+            sha = t["commit"]["sha"]
+            # the commit date is another request, only make it when it is needed
+            commit_date = None
+            if ret and version <= ret["version"]:
+                commit_date = self.get_commit_date(sha)
+                if commit_date <= ret["tag_date"]:
+                    continue
+            # rare case: if upstream filed formal pre-release that passes as stable
+            # version (tag is 1.2.3 instead of 1.2.3b) double check if pre-release
+            # TODO handle API failure here as it may result in "false positive"?
+            release_for_tag = self.get_formal_release_for_tag(tag_name)
+            if release_for_tag:
+                ret = self.set_matching_formal_release(
+                    ret, release_for_tag, version, pre_ok
+                )
+            else:
+                if commit_date is None:
+                    commit_date = self.get_commit_date(sha)
+                ret = t
+                ret["tag_name"] = tag_name
+                ret["tag_date"] = commit_date
+                ret["version"] = version
+                ret["type"] = "tag"
         return ret
 
     def get_releases_feed_contents(self, rename_checked=False):
@@ -514,7 +538,7 @@ class GitHubRepoSession(BaseProjectHolder):
             # get redirect there as well as the new repo full name
             r = self.repo_query("")
             if r.status_code == 200:
-                repo_data = r.json()
+                repo_data = response_json(r)
                 if self.repo != repo_data["full_name"]:
                     log.info(
                         "Detected name change from %s to %s",
@@ -535,6 +559,9 @@ class GitHubRepoSession(BaseProjectHolder):
         if not feed_contents:
             log.info("The releases.atom feed failed to be fetched!")
             return None
+        # deferred: not needed when the CLI only prints help or its version
+        import feedparser
+
         feed = feedparser.parse(feed_contents)
         if "bozo" in feed and feed["bozo"] == 1 and "bozo_exception" in feed:
             exc = feed.bozo_exception
@@ -598,7 +625,7 @@ class GitHubRepoSession(BaseProjectHolder):
                     continue
                 if self.semver_check_skip(version, ret):
                     continue
-                tag_date = parser.parse(tag["updated"])
+                tag_date = parse_timestamp(tag["updated"])
                 if ret and ret["version"] == version and ret["tag_date"] >= tag_date:
                     log.info(
                         "Tag %s matches already selected version and is not newer",
@@ -632,6 +659,13 @@ class GitHubRepoSession(BaseProjectHolder):
                     log.info("Selected version as current selection: %s.", version)
         return ret or None
 
+    @staticmethod
+    def is_recent_release(ret, days=365):
+        """Check if the selected release is recent enough to skip looking at tags."""
+        return bool(ret) and ret["tag_date"].replace(tzinfo=None) > (
+            datetime.utcnow() - timedelta(days=days)
+        )
+
     def get_latest(self, pre_ok=False, major=None):
         """
         Get the latest release satisfying "pre-releases are OK" or major/branch constraints
@@ -654,9 +688,7 @@ class GitHubRepoSession(BaseProjectHolder):
             # we are good with release from feeds only without looking at the API
             # simply because feeds list stuff in order of recency,
             # however, still use /tags unless releases.atom has data within a year
-            if ret and ret["tag_date"].replace(tzinfo=None) > (
-                datetime.utcnow() - timedelta(days=365)
-            ):
+            if self.is_recent_release(ret):
                 return self.enrich_release_info(ret)
 
             log.info(
@@ -684,6 +716,13 @@ class GitHubRepoSession(BaseProjectHolder):
             # return whatever we got
             return self.enrich_release_info(ret)
 
+        # unlike the feed, /releases does not list plain tags, so a newer version
+        # may be tag-only; only a formal release that fresh makes that unlikely
+        if not self.thorough and self.is_recent_release(
+            ret, days=self.RECENT_FORMAL_RELEASE_DAYS
+        ):
+            return self.enrich_release_info(ret)
+
         # formal release may not exist at all, or be "late/old" in case
         # actual release is only a simple tag, so let's try /tags
         if self.api_token:
@@ -734,10 +773,10 @@ class GitHubRepoSession(BaseProjectHolder):
                 if not found_asset:
                     log.info("Desired asset not found in the release.")
                     return ret
-        formal_release["tag_date"] = parser.parse(formal_release["published_at"])
+        formal_release["tag_date"] = parse_timestamp(formal_release["published_at"])
         # if created_at is newer than published_at, use it
         if formal_release.get("created_at"):
-            created_at = parser.parse(formal_release["created_at"])
+            created_at = parse_timestamp(formal_release["created_at"])
             if created_at > formal_release["tag_date"]:
                 formal_release["tag_date"] = created_at
         formal_release["version"] = version
@@ -5,10 +5,13 @@ import platform
 import re
 from datetime import timedelta
 
-from dateutil import parser
 
 from lastversion.repo_holders.base import BaseProjectHolder
-from lastversion.utils import asset_does_not_belong_to_machine
+from lastversion.utils import (
+    asset_does_not_belong_to_machine,
+    parse_timestamp,
+    source_archive_ext,
+)
 
 from lastversion.exceptions import BadProjectError
 
@@ -111,7 +114,7 @@ class GitLabRepoSession(BaseProjectHolder):
         if r.status_code == 200:
             for t in r.json():
                 tag = t["name"]
-                tag_date = parser.parse(t["commit"]["created_at"])
+                tag_date = parse_timestamp(t["commit"]["created_at"])
                 version = self.sanitize_version(tag, pre_ok, major)
                 if not version:
                     continue
@@ -133,6 +136,9 @@ class GitLabRepoSession(BaseProjectHolder):
 
     def get_assets(self, release, short_urls, assets_filter=None):
         """Get assets for a given release."""
+        if assets_filter and isinstance(assets_filter, str):
+            # library callers may pass a string, compile it once for all assets
+            assets_filter = re.compile(assets_filter)
         urls = []
         assets = release.get("assets", {}).get("links", [])
         arch_matched_assets = []
@@ -144,7 +150,7 @@ class GitLabRepoSession(BaseProjectHolder):
                 assets = arch_matched_assets
 
         for asset in assets:
-            if assets_filter and not re.search(assets_filter, asset["name"]):
+            if assets_filter and not assets_filter.search(asset["name"]):
                 continue
             if not assets_filter and asset_does_not_belong_to_machine(asset["name"]):
                 log.info(
@@ -156,7 +162,7 @@ class GitLabRepoSession(BaseProjectHolder):
 
         if not urls:
             download_url = self.release_download_url(release, short_urls)
-            if not assets_filter or re.search(assets_filter, download_url):
+            if not assets_filter or assets_filter.search(download_url):
                 urls.append(download_url)
         return urls
 
@@ -165,12 +171,10 @@ class GitLabRepoSession(BaseProjectHolder):
         if shorter:
             log.info("Shorter URLs are not supported for GitLab yet")
         # https://gitlab.com/onedr0p/sonarr-episode-prune/-/archive/v3.0.0/sonarr-episode-prune-v3.0.0.tar.gz
-        ext = "zip" if os.name == "nt" else "tar.gz"
         tag = release["tag_name"]
-        url_format = "https://{}/{}/-/archive/{}/{}-{}.{}"
-        return url_format.format(
-            self.hostname, self.repo, tag, self.repo.split("/")[1], tag, ext
-        )
+        name = self.repo.split("/")[1]
+        ext = source_archive_ext
+        return f"https://{self.hostname}/{self.repo}/-/archive/{tag}/{name}-{tag}.{ext}"
 
     def repo_license(self, tag):
         """Get repo license."""
@@ -1,9 +1,8 @@
 """Helm Chart repo holder."""
 import logging
 
-import yaml
-
 from lastversion.repo_holders.base import BaseProjectHolder
+from lastversion.utils import load_yaml
 
 log = logging.getLogger(__name__)
 
@@ -30,7 +29,7 @@ class HelmChartRepoSession(BaseProjectHolder):
                 f"https://raw.githubusercontent.com/{self.repo.replace('/blob/', '/')}"
             )
         r = self.get(url)
-        chart_data = yaml.safe_load(r.text)
+        chart_data = load_yaml(r.text)
         return {
             "tag_name": None,
             "tag_date": None,
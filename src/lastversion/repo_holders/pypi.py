@@ -1,10 +1,10 @@
 """A module to represent a Pypi project holder."""
 import logging
 
-from dateutil import parser
 
 from lastversion.repo_holders.base import BaseProjectHolder
-from lastversion.version import Version
+from lastversion.utils import parse_timestamp
+from lastversion.version import make_version
 
 log = logging.getLogger(__name__)
 
@@ -58,7 +58,7 @@ class PypiRepoSession(BaseProjectHolder):
             return None
         if not major:
             latest_ver = self.project["info"]["version"]
-            v = Version(latest_ver)
+            v = make_version(latest_ver)
             ret["version"] = v
             # there are no tags, we just put version string there
             ret["tag_name"] = latest_ver
@@ -73,7 +73,7 @@ class PypiRepoSession(BaseProjectHolder):
         if "tag_name" in ret:
             # consider tag_date as upload time of the selected release first file
             ret["files"] = self.project["releases"][ret["tag_name"]]
-            ret["tag_date"] = parser.parse(ret["files"][0]["upload_time"])
+            ret["tag_date"] = parse_timestamp(ret["files"][0]["upload_time"])
             return ret
         return None
 
@@ -2,22 +2,36 @@
 
 import logging
 
-from bs4 import BeautifulSoup
-from dateutil import parser
-
 from lastversion.repo_holders.base import BaseProjectHolder
 
 log = logging.getLogger(__name__)
 
+# lxml parses large Wikipedia pages much faster than the stock parser
+HTML_PARSER = "html.parser"
+try:
+    # noinspection PyUnresolvedReferences
+    import lxml  # noqa: F401
+
+    HTML_PARSER = "lxml"
+except ImportError:
+    pass
+
+# CSS selectors used on every infobox lookup
+INFOBOX_SELECTOR = ".infobox"
+# release labels are links in the row header cells, data cells hold many more
+LABEL_LINK_SELECTOR = "th > a"
+INFOBOX_DATA_SELECTOR = ".infobox-data"
+PUBLISHED_SELECTOR = "span.published"
+FOOTNOTES_SELECTOR = "sup, span"
+
+# infobox labels of the row holding the release version
+RELEASE_LABELS = frozenset(["latest release", "stable release"])
+
 
 def remove_words(title):
     """Remove words from a title that are not part of the version."""
-    parts = title.split(" ")
-    parts_n = []
-    for part in parts:
-        if not part.isalpha() or ".post" in part:
-            parts_n.append(part)
-    return " ".join(parts_n)
+    # purely alphabetic parts never carry a version (nor a ".post" marker)
+    return " ".join(part for part in title.split(" ") if not part.isalpha())
 
 
 class WikipediaRepoSession(BaseProjectHolder):
@@ -61,33 +75,39 @@ class WikipediaRepoSession(BaseProjectHolder):
 
     def get_latest(self, pre_ok=False, major=None):
         """Get the latest release."""
+        # deferred: the HTML stack is only needed for Wikipedia lookups
+        from bs4 import BeautifulSoup
+        from dateutil import parser
+
         tag_name = None
         tag = {}
         r = self.get(f"https://{self.hostname}/wiki/{self.repo}")
-        soup = BeautifulSoup(r.text, "html.parser")
+        # raw bytes let the parser pick up the charset from the page itself
+        soup = BeautifulSoup(r.content, HTML_PARSER)
         # we only need the first one
-        infobox = soup.select_one(".infobox")
-        links = infobox.select("a")
+        infobox = soup.select_one(INFOBOX_SELECTOR)
+        links = infobox.select(LABEL_LINK_SELECTOR)
         for link in links:
-            if link.text.lower() in ["latest release", "stable release"]:
-                release_data = link.parent.parent.select_one(".infobox-data")
+            if link.text.lower() in RELEASE_LABELS:
+                release_data = link.parent.parent.select_one(INFOBOX_DATA_SELECTOR)
                 # get published before it's removed:
-                published_span = release_data.select_one("span.published")
+                published_span = release_data.select_one(PUBLISHED_SELECTOR)
                 if published_span:
                     tag["tag_date"] = parser.parse(published_span.text)
-                for t in release_data.select("sup, span"):
+                for t in release_data.select(FOOTNOTES_SELECTOR):
                     t.decompose()
-                tag_name = release_data.text
-                tag_name = tag_name.replace(" Service Pack ", ".post")
+                # `.text` walks the whole cell, so only collect it once
+                release_text = release_data.text
+                tag_name = release_text.replace(" Service Pack ", ".post")
                 # remove alphas from beginning
                 tag_name = remove_words(tag_name).split("/", maxsplit=1)[0]
-                # Remove unicode stuff (for Python 2)
-                tag["title"] = release_data.text.encode("ascii", "ignore").decode()
+                # Remove non-breaking spaces and other unicode stuff
+                tag["title"] = release_text.encode("ascii", "ignore").decode()
                 log.info("Pre-parsed title: %s", tag["title"])
                 break
         if not tag_name:
             return None
-        # Remove unicode stuff (for Python 2)
+        # Remove non-breaking spaces and other unicode stuff
         tag_name = tag_name.encode("ascii", "ignore").decode()
         version = self.sanitize_version(tag_name, pre_ok, major)
         if version:
@@ -2,7 +2,7 @@
 import logging
 
 from lastversion.repo_holders.base import BaseProjectHolder
-from lastversion.version import Version
+from lastversion.version import make_version
 
 
 log = logging.getLogger(__name__)
@@ -27,6 +27,14 @@ class WordPressPluginRepoSession(BaseProjectHolder):
             project = response.json()
         return project
 
+    @property
+    def project(self):
+        """Project JSON data, lazily fetched on first use."""
+        if not self.project_fetched:
+            self.project_data = self.get_project()
+            self.project_fetched = True
+        return self.project_data
+
     def is_instance(self):
         return self.project
 
@@ -36,7 +44,9 @@ class WordPressPluginRepoSession(BaseProjectHolder):
             self.hostname = hostname
         else:
             self.hostname = WordPressPluginRepoSession.DEFAULT_HOSTNAME
-        self.project = self.get_project()
+        # lazy loaded project JSON, URL formatting does not need it
+        self.project_data = None
+        self.project_fetched = False
 
     def release_download_url(self, release, shorter=False):
         """Get release download URL."""
@@ -50,7 +60,7 @@ class WordPressPluginRepoSession(BaseProjectHolder):
 
         if not major:
             latest_ver = self.project["version"]
-            v = Version(latest_ver)
+            v = make_version(latest_ver)
             ret["version"] = v
             # there are no tags, we just put version string there
             ret["tag_name"] = latest_ver
@@ -12,12 +12,14 @@ import sys
 import tarfile
 import tempfile
 import zipfile
+from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import unquote
 
 import distro
 import requests
-import tqdm
+from appdirs import user_cache_dir
 
 from lastversion.exceptions import TarPathTraversalException
 
@@ -39,7 +41,18 @@ try:
 except ImportError:
     pass
 
+# orjson decodes API responses faster and with fewer temporary objects
+ORJSON_AVAILABLE = False
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    pass
+
 DOWNLOAD_TIMEOUT = 30
+# downloads are copied to disk in blocks of this size
+DOWNLOAD_BUFFER_SIZE = 1024 * 1024
 
 log = logging.getLogger(__name__)
 content_disposition_regex = re.compile(
@@ -53,6 +66,17 @@ os_extensions = {
     "posix": (".tgz", ".tar.gz"),
 }
 
+# source archives are offered as zip to Windows users and as tarball to the rest
+source_archive_ext = "zip" if os.name == "nt" else "tar.gz"
+
+# the extensions meant for any other OS than this one, as one tuple for endswith()
+foreign_os_extensions = tuple(
+    ext
+    for os_name, extensions in os_extensions.items()
+    if os_name != os.name
+    for ext in extensions
+)
+
 # Extensions exclusive to specific distros as per `distro.id()`
 extension_distros = {
     "deb": ["ubuntu", "debian"],
@@ -89,27 +113,59 @@ non_amd64_markers = [
     "armv7hl",
 ]
 
+def marker_literals(words):
+    """
+    Get the substrings that any name matching the given marker words contains.
+    Words containing another marker word are redundant, e.g. "arm" covers "armhf".
+    """
+    return tuple(
+        sorted({w for w in words if not any(o != w and o in w for o in words)})
+    )
+
 
-def is_file_ext_not_compatible_with_os(file_ext):
+# a cheap substring test on the lowercase asset name rules out most assets,
+# before the regexes below have to verify the word boundaries
+platform_marker_literals = {
+    platform_name: marker_literals(pf_words)
+    for platform_name, pf_words in platform_markers.items()
+}
+non_amd64_marker_literals = marker_literals(non_amd64_markers)
+
+# the markers above as one word-bounded alternation each, so that an asset
+# name is scanned once per platform rather than once per word.
+# Unlike \b, these boundaries treat the underscore as a separator, too
+word_start = r"(?<![^\W_])"
+word_end = r"(?![^\W_])"
+platform_marker_regexes = {
+    platform_name: re.compile(
+        rf"{word_start}(?:{'|'.join(pf_words)})(\d+)?{word_end}", flags=re.IGNORECASE
+    )
+    for platform_name, pf_words in platform_markers.items()
+}
+non_amd64_marker_regex = re.compile(
+    rf"{word_start}(?:{'|'.join(non_amd64_markers)}|arm\d+){word_end}",
+    flags=re.IGNORECASE,
+)
+
+
+def is_file_ext_not_compatible_with_os(file_name):
     """
     Check if the file extension is not compatible with the OS
     Returns:
 
     """
-    return any(
-        os.name != os_name and file_ext == ext for os_name, ext in os_extensions.items()
-    )
+    return file_name.lower().endswith(foreign_os_extensions)
 
 
 def is_asset_name_compatible_with_platform(asset_name):
     """Check if an asset has words that indicate it's not for this platform."""
-    for platform_name, pf_words in platform_markers.items():
-        if not sys.platform.startswith(platform_name):
-            for pf_word in pf_words:
-                regex = re.compile(rf"\b{pf_word}(\d+)?\b", flags=re.IGNORECASE)
-                matches = regex.search(asset_name)
-                if matches:
-                    return True
+    asset_name_lower = asset_name.lower()
+    for platform_name, regex in platform_marker_regexes.items():
+        if sys.platform.startswith(platform_name):
+            continue
+        literals = platform_marker_literals[platform_name]
+        if any(w in asset_name_lower for w in literals) and regex.search(asset_name):
+            return True
     return False
 
 
@@ -131,14 +187,10 @@ def is_not_compatible_bitness(asset_name):
     """Check if an asset has words that show it's not meant for 64-bit OS"""
     if platform.machine() not in ["x86_64", "AMD64"]:
         return False
-    for non_amd64_word in non_amd64_markers:
-        regex = re.compile(rf"\b{non_amd64_word}\b", flags=re.IGNORECASE)
-        if regex.search(asset_name):
-            return True
-        regex = re.compile(r"\barm\d+\b", flags=re.IGNORECASE)
-        if regex.search(asset_name):
-            return True
-    return False
+    asset_name_lower = asset_name.lower()
+    if not any(w in asset_name_lower for w in non_amd64_marker_literals):
+        return False
+    return bool(non_amd64_marker_regex.search(asset_name))
 
 
 def asset_does_not_belong_to_machine(asset_name):
@@ -152,9 +204,6 @@ def asset_does_not_belong_to_machine(asset_name):
     Returns:
 
     """
-    # replace underscore with dash so that our shiny word boundary regexes
-    # won't break
-    asset_name = asset_name.replace("_", "-")
     asset_ext = os.path.splitext(asset_name)[1].lstrip(".")
 
     if not asset_ext:
@@ -162,7 +211,7 @@ def asset_does_not_belong_to_machine(asset_name):
         return False
 
     # Bail if asset's extension "belongs" to other OS (simple)
-    if is_file_ext_not_compatible_with_os(asset_ext):
+    if is_file_ext_not_compatible_with_os(asset_name):
         return True
 
     if is_asset_name_compatible_with_platform(asset_name):
@@ -270,6 +319,16 @@ def get_content_disposition_filename(response):
     return filename
 
 
+@lru_cache(maxsize=None)
+def get_download_session():
+    """Get the session used for downloads.
+
+    Assets downloaded one after another from the same host then reuse
+    its connection instead of doing a new TLS handshake for each.
+    """
+    return requests.Session()
+
+
 def download_file(url, local_filename=None):
     """Download a URL to the given filename.
 
@@ -285,7 +344,9 @@ def download_file(url, local_filename=None):
         local_filename = url.split("/")[-1]
     try:
         # Note that the stream=True parameter below
-        with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        with get_download_session().get(
+            url, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
             response.raise_for_status()
             if "." not in local_filename and "Content-Disposition" in response.headers:
                 disp_filename = get_content_disposition_filename(response)
@@ -293,28 +354,30 @@ def download_file(url, local_filename=None):
                     local_filename = disp_filename
             # content-length may be empty, default to 0
             file_size = int(response.headers.get("Content-Length", 0))
-            bar_size = 1024
-            # fetch 8 KB at a time
-            chunk_size = 8192
-            # how many bars are there in a chunk?
-            chunk_bar_size = chunk_size / bar_size
-            # bars are by KB
-            num_bars = int(file_size / bar_size)
+
+            # deferred: the progress bar is only needed when downloading
+            import tqdm
+            from tqdm.utils import CallbackIOWrapper
 
             # noinspection PyTypeChecker
             pbar = tqdm.tqdm(
                 disable=None,  # disable on non-TTY
-                total=num_bars,
-                unit="KB",
+                total=file_size,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
                 desc=f"Downloading {local_filename}",
                 leave=True,  # progressbar stays
             )
+            # undo Content-Encoding while reading, as iter_content() would
+            response.raw.decode_content = True
             with open(local_filename, "wb") as file:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:  # filter out keep-alive new chunks
-                        file.write(chunk)
-                        # we fetch 8 KB, so we update progress by +8x
-                        pbar.update(chunk_bar_size)
+                # copy in large blocks, the progress bar advances with each write
+                shutil.copyfileobj(
+                    response.raw,
+                    CallbackIOWrapper(pbar.update, file, "write"),
+                    DOWNLOAD_BUFFER_SIZE,
+                )
             pbar.set_description(f"Downloaded {local_filename}")
             pbar.close()
     except KeyboardInterrupt:
@@ -422,31 +485,34 @@ def extract_file(url: str, to_dir="."):
         log.critical("pip install py7zr to support .7z archives")
         return
     try:
-        with requests.get(url, stream=True, timeout=DOWNLOAD_TIMEOUT) as response:
+        with get_download_session().get(
+            url, stream=True, timeout=DOWNLOAD_TIMEOUT
+        ) as response:
             response.raise_for_status()
             # Download the file in chunks and save it to a memory buffer
             # content-length may be empty, default to 0
             file_size = int(response.headers.get("Content-Length", 0))
-            bar_size = 1024
-            # fetch 8 KB at a time
-            chunk_size = 8192
-            # how many bars are there in a chunk?
-            chunk_bar_size = chunk_size / bar_size
-            # bars are by KB
-            num_bars = int(file_size / bar_size)
 
             buffer = io.BytesIO()
+            import tqdm
+            from tqdm.utils import CallbackIOWrapper
+
+            # undo Content-Encoding while reading, as iter_content() would
+            response.raw.decode_content = True
             # noinspection PyTypeChecker
             with tqdm.tqdm(
                 disable=None,  # disable on non-TTY
-                total=num_bars,
-                unit="KB",
+                total=file_size,
+                unit="B",
+                unit_scale=True,
+                unit_divisor=1024,
                 desc=url.split("/")[-1],
             ) as pbar:
-                for chunk in response.iter_content(chunk_size=chunk_size):
-                    if chunk:
-                        buffer.write(chunk)
-                        pbar.update(chunk_bar_size)
+                shutil.copyfileobj(
+                    response.raw,
+                    CallbackIOWrapper(pbar.update, buffer, "write"),
+                    DOWNLOAD_BUFFER_SIZE,
+                )
 
             # Process the file in memory (e.g., extract its contents)
             buffer.seek(0)
@@ -499,3 +565,44 @@ def ensure_directory_exists(directory_path):
     except OSError as exception:
         if exception.errno != errno.EEXIST:
             raise
+
+
+def load_yaml(stream):
+    """
+    Parse YAML document from a string or a file object.
+    PyYAML is imported on first use, as most invocations never read YAML.
+    LibYAML bindings are preferred, they parse several times faster.
+    """
+    import yaml
+
+    loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+    return yaml.load(stream, Loader=loader)
+
+
+def response_json(response):
+    """Decode the JSON body of a `requests` response, with orjson if available."""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(response.content)
+    return response.json()
+
+
+@lru_cache(maxsize=None)
+def get_cache_dir():
+    """Get the per-user cache directory of lastversion, resolved once per process."""
+    return user_cache_dir(__name__.split(".", maxsplit=1)[0])
+
+
+def parse_timestamp(value):
+    """
+    Parse an ISO 8601 timestamp as returned by the APIs, e.g. 2023-01-31T10:00:00Z.
+    The fixed format is handled by `datetime.fromisoformat`, anything it rejects
+    (or Python 3.6, which lacks it) goes through the generic `dateutil` parser.
+    """
+    if value[-1:] == "Z" and sys.version_info < (3, 11):
+        value = value[:-1] + "+00:00"
+    try:
+        return datetime.fromisoformat(value)
+    except (AttributeError, ValueError):
+        from dateutil import parser
+
+        return parser.parse(value)
@@ -1,6 +1,7 @@
 """Version class for lastversion"""
 import re
 from datetime import datetime
+from functools import lru_cache
 
 from packaging.version import Version as PackagingVersion, InvalidVersion
 
@@ -22,9 +23,15 @@ class Version(PackagingVersion):
                         any way, then this exception will be raised.
     """
 
+    # Instances are created for every candidate tag, keep them small; the
+    # per-instance dict is only gone when packaging's classes are slotted too
+    __slots__ = ("fixed_letter_post_release", "_str_cache")
+
     # Precompile the regular expressions
     rc_pattern = re.compile(r"^rc(\d+)\.")
     post_pattern = re.compile(r"^p(\d+)$")
+    leading_non_digit_pattern = re.compile(r"^[^0-9]+")
+    letter_post_release_pattern = re.compile(r"(\d)([a-z])$")
 
     regex_dashed_substitutions = [
         (re.compile(r"-p(\d+)$"), "-post\\1"),
@@ -112,6 +119,10 @@ class Version(PackagingVersion):
         Returns:
             str:
         """
+        # every substitution pattern involves a dash, skip the regex engine
+        # for the common dashless input
+        if "-" not in version:
+            return version
         for regex, substitution in Version.regex_dashed_substitutions:
             version = regex.sub(substitution, version)
         return version
@@ -121,35 +132,36 @@ class Version(PackagingVersion):
         Filter out irrelevant parts from version string.
         Parse out version components separated by dash.
         """
-        parts = version.split("-")
-
-        # go through parts which were separated by dash, normalize and
-        # exclude irrelevant
-        parts_n = []
-        for part in parts:
-            part = self.part_to_pypi(part)
-            if part:
-                parts_n.append(part)
-        if not parts_n:
-            raise InvalidVersion(f"Invalid version: '{version}'")
         # Remove *any* non-digits which appear at the beginning of the
         # version string e.g. Rhino1_7_13_Release does not even bother to
         # put a delimiter... such string at the beginning typically do not
         # convey stability level, so we are fine to remove them (unlike the
         # ones in the tail)
-        parts_n[0] = re.sub("^[^0-9]+", "", parts_n[0], 1)
+        if "-" not in version:
+            # single part, nothing to join
+            part = self.part_to_pypi(version)
+            if not part:
+                raise InvalidVersion(f"Invalid version: '{version}'")
+            return Version.leading_non_digit_pattern.sub("", part, 1)
 
-        # Remove empty elements
-        parts_n = [item for item in parts_n if item != ""]
+        # go through parts which were separated by dash, normalize and
+        # exclude irrelevant
+        parts_n = tuple(
+            part for part in map(self.part_to_pypi, version.split("-")) if part
+        )
+        if not parts_n:
+            raise InvalidVersion(f"Invalid version: '{version}'")
+        head = Version.leading_non_digit_pattern.sub("", parts_n[0], 1)
+        # only the head may have become empty, drop it then
+        parts_n = (head,) + parts_n[1:] if head else parts_n[1:]
 
         # If more than 1 element and second element are a number, use only first
         # e.g. 1.2.3-4 -> 1.2.3
         if len(parts_n) > 1 and "." in parts_n[0] and parts_n[1].isdigit():
-            parts_n = parts_n[:1]
+            return parts_n[0]
 
         # go back to full string parse out
-        version = ".".join(parts_n)
-        return version
+        return ".".join(parts_n)
 
     def __init__(self, version, char_fix_required=False):
         """Instantiate the `Version` object.
@@ -159,6 +171,13 @@ class Version(PackagingVersion):
             char_fix_required (bool): Should we treat alphanumerics as part of version
         """
         self.fixed_letter_post_release = False
+        # string representation is built once, on first use
+        self._str_cache = None
+
+        # Plain dotted numbers like 1.2.3 need no normalization at all
+        if "0" <= version[:1] <= "9" and version.replace(".", "").isdigit():
+            super().__init__(version)
+            return
 
         version = self.special_cases_transformation(version)
         # Join status with its number, e.g., preview-3 -> pre3
@@ -166,61 +185,24 @@ class Version(PackagingVersion):
         version = self.filter_relevant_parts(version)
 
         if char_fix_required:
-            version = re.sub("(\\d)([a-z])$", self.fix_letter_post_release, version, 1)
+            version = self.letter_post_release_pattern.sub(
+                self.fix_letter_post_release, version, 1
+            )
         # release-3_0_2 is often seen on Mercurial holders note that the
         # above code removes "release-" already, so we are left with "3_0_2"
-        if re.search(r"^(?:\d+_)+(?:\d+)", version):
-            version = version.replace("_", ".")
+        if "_" in version:
+            head, _, tail = version.partition("_")
+            if head.isdecimal() and tail[:1].isdecimal():
+                version = version.replace("_", ".")
         # finally, split by dot "delimiter", see if there are common words
-        # which are definitely removable
-        parts = version.split(".")
-        version = []
-        for p in parts:
-            if p.lower() in ["release"]:
-                continue
-            version.append(p)
-        version = ".".join(version)
+        # which are definitely removable (only if there might be any).
+        # This has to come after the underscore fix: Rhino1_7_13_Release
+        if "release" in version.lower():
+            version = ".".join(
+                p for p in version.split(".") if p.lower() != "release"
+            )
         super().__init__(version)
 
-    @property
-    def epoch(self):
-        # type: () -> int
-        """
-        An integer giving the version epoch of this Version instance
-        """
-        _epoch = self._version.epoch  # type: int
-        return _epoch
-
-    @property
-    def release(self):
-        """
-        A tuple of integers giving the components of the release segment
-        of this Version instance; that is, the 1.2.3 part of the version
-        number, including trailing zeroes but not including the epoch or
-        any prerelease/development/post-release suffixes
-        """
-        _release = self._version.release
-        return _release
-
-    @property
-    def pre(self):
-        _pre = self._version.pre
-        return _pre
-
-    @property
-    def post(self):
-        return self._version.post[1] if self._version.post else None
-
-    @property
-    def dev(self):
-        return self._version.dev[1] if self._version.dev else None
-
-    @property
-    def local(self):
-        if self._version.local:
-            return ".".join(str(x) for x in self._version.local)
-        return None
-
     @property
     def major(self):
         # type: () -> int
@@ -279,41 +261,63 @@ class Version(PackagingVersion):
         """
         if level == "major":
             # get major
-            return Version(str(self.major))
+            return make_version(str(self.major))
         if level == "minor":
-            return Version(f"{self.major}.{self.minor}")
+            return make_version(f"{self.major}.{self.minor}")
         if level == "patch":
-            return Version(f"{self.major}.{self.minor}.{self.micro}")
+            return make_version(f"{self.major}.{self.minor}.{self.micro}")
         return self
 
-    def __str__(self):
-        # type: () -> str
-        parts = []
-
-        # Epoch
-        if self.epoch != 0:
-            parts.append(f"{self.epoch}!")
-
-        # Release segment
-        parts.append(".".join(str(x) for x in self.release))
+    def __copy__(self):
+        # instances are never changed after they are built, share them
+        return self
 
-        # Pre-release
-        if self.pre is not None:
-            parts.append("".join(str(x) for x in self.pre))
+    def __deepcopy__(self, memo):
+        return self
 
-        # Post-release
-        if self.post is not None:
-            if self.fixed_letter_post_release:
-                parts.append(f"{chr(self.post)}")
-            else:
-                parts.append(f".post{self.post}")
+    def __str__(self):
+        # type: () -> str
+        if self._str_cache is None:
+            self._str_cache = self.build_str()
+        return self._str_cache
 
-        # Development release
-        if self.dev is not None:
-            parts.append(f".dev{self.dev}")
+    def build_str(self):
+        # type: () -> str
+        """Build the string representation of this Version."""
+        # read each segment property once
+        epoch, pre, post, dev, local = (
+            self.epoch,
+            self.pre,
+            self.post,
+            self.dev,
+            self.local,
+        )
+        epoch_s = f"{epoch}!" if epoch != 0 else ""
+        release_s = ".".join(map(str, self.release))
+        pre_s = "".join(map(str, pre)) if pre is not None else ""
+        if post is None:
+            post_s = ""
+        elif self.fixed_letter_post_release:
+            post_s = chr(post)
+        else:
+            post_s = f".post{post}"
+        dev_s = f".dev{dev}" if dev is not None else ""
+        local_s = f"+{local}" if local is not None else ""
+        return f"{epoch_s}{release_s}{pre_s}{post_s}{dev_s}{local_s}"
+
+
+@lru_cache(maxsize=4096)
+def make_version(version, char_fix_required=False):
+    """
+    Return a `Version` for the given string, reusing instances for repeat input.
+    Projects tend to see the same tag names over and over (feeds, API pages,
+    known repos), and `Version` objects are not mutated once built.
 
-        # Local version segment
-        if self.local is not None:
-            parts.append(f"+{self.local}")
+    Args:
+        version (str): The version-like string
+        char_fix_required (bool): Should we treat alphanumerics as part of version
 
-        return "".join(parts)
+    Raises:
+        InvalidVersion: If the `version` cannot be parsed (failures are not cached)
+    """
+    return Version(version, char_fix_required=char_fix_required)
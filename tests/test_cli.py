@@ -1,5 +1,6 @@
 """Test CLI functions."""
 
+import json
 import os
 import subprocess
 import sys
@@ -7,6 +8,7 @@ import tempfile
 
 from packaging import version
 
+from lastversion import cli
 from lastversion.cli import main
 from .helpers import captured_exit_code
 
@@ -152,3 +154,16 @@ def test_cli_get_assets(capsys):
 
         captured = capsys.readouterr()
         assert ".AppImage" in captured.out
+
+
+def test_cli_json_output_same_without_orjson(monkeypatch, capsysbinary):
+    """Test -f json prints the same bytes whether orjson is installed or not."""
+    res = {"version": "1.0", "name": "Zoë ✓", 2: [None, True, 0.5]}
+    monkeypatch.setattr(cli, "latest", lambda *args, **kwargs: dict(res))
+    outputs = []
+    for orjson_available in (cli.ORJSON_AVAILABLE, False):
+        monkeypatch.setattr(cli, "ORJSON_AVAILABLE", orjson_available)
+        main(["--format", "json", "foo/bar"])
+        outputs.append(capsysbinary.readouterr().out)
+    assert outputs[0] == outputs[1]
+    assert json.loads(outputs[1]) == {"version": "1.0", "name": "Zoë ✓", "2": res[2]}
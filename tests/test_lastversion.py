@@ -1,14 +1,35 @@
 """Test lastversion."""
+import io
+import json
+import marshal
 import os
 
 import subprocess
+from datetime import date, datetime, timedelta, timezone
+from email.utils import formatdate
+from unittest import mock
 
 import pytest
+import requests
+from cachecontrol.controller import CacheController
 from packaging import version
+from urllib3 import HTTPResponse
 
+from lastversion.repo_holders.base import (
+    SEPARATE_BODY_CACHE_AVAILABLE,
+    BaseProjectHolder,
+)
+from lastversion.repo_holders.github import GitHubRepoSession
 from lastversion.repo_holders.test import TestProjectHolder
-from lastversion.version import Version
-from lastversion.lastversion import latest
+from lastversion.utils import asset_does_not_belong_to_machine, parse_timestamp
+from lastversion.version import Version, make_version
+from lastversion import lastversion as lastversion_module
+from lastversion.lastversion import (
+    get_repo_data_from_yml,
+    has_update,
+    latest,
+    parse_version,
+)
 
 from lastversion.exceptions import BadProjectError
 
@@ -225,6 +246,103 @@ def test_yml_input():
     assert v["license"]["path"] == "LICENSE"
 
 
+def test_yml_parsed_data_is_cached(tmp_path, monkeypatch):
+    """Test that parsed .yml data is reused until the file changes."""
+    monkeypatch.setattr(
+        lastversion_module, "get_cache_dir", lambda: str(tmp_path / "cache")
+    )
+    repo = str(tmp_path / "geoip2.yml")
+    with open(repo, "w", encoding="utf-8") as f:
+        f.write("repo: leev/ngx_http_geoip2_module\nmodule_of: nginx\n")
+
+    repo_data = get_repo_data_from_yml(repo)
+    assert repo_data["name"] == "nginx-module-geoip2"
+    cache_filename = lastversion_module.get_yml_cache_filename(repo)
+    assert os.path.exists(cache_filename)
+
+    # a fresh cache is used as is
+    with open(cache_filename, "wb") as f:
+        marshal.dump({"repo": "cached/repo"}, f)
+    lastversion_module.read_repo_data_from_yml.cache_clear()
+    assert get_repo_data_from_yml(repo) == {"repo": "cached/repo", "name": "geoip2"}
+
+    # a stale cache is ignored
+    os.utime(cache_filename, (0, 0))
+    lastversion_module.read_repo_data_from_yml.cache_clear()
+    assert get_repo_data_from_yml(repo) == repo_data
+
+
+def test_yml_parsed_data_is_kept_in_memory(tmp_path, monkeypatch):
+    """Test that .yml data is read again only after the file changes."""
+    monkeypatch.setattr(BaseProjectHolder, "CACHE_DISABLED", True)
+    repo = str(tmp_path / "geoip2.yml")
+    with open(repo, "w", encoding="utf-8") as f:
+        f.write("repo: leev/ngx_http_geoip2_module\n")
+    os.utime(repo, ns=(0, 0))
+
+    repo_data = get_repo_data_from_yml(repo)
+    repo_data["repo"] = "changed/by-caller"
+    with open(repo, "w", encoding="utf-8") as f:
+        f.write("repo: other/repo\n")
+    os.utime(repo, ns=(0, 0))
+    assert get_repo_data_from_yml(repo)["repo"] == "leev/ngx_http_geoip2_module"
+
+    os.utime(repo, ns=(10**9, 10**9))
+    assert get_repo_data_from_yml(repo)["repo"] == "other/repo"
+
+
+def test_yml_in_nginx_extras_named_dir_is_not_a_module(tmp_path, monkeypatch):
+    """Test only the given path, not its parent dirs, marks an nginx module."""
+    monkeypatch.setattr(BaseProjectHolder, "CACHE_DISABLED", True)
+    specs_dir = tmp_path / "nginx-extras-specs"
+    specs_dir.mkdir()
+    abs_repo = specs_dir / "foo.yml"
+    abs_repo.write_text("repo: foo/bar\n", encoding="utf-8")
+
+    # as when called with "foo.yml" from inside the directory
+    read = lastversion_module.read_repo_data_from_yml
+    repo_data = read("foo.yml", str(abs_repo), abs_repo.stat().st_mtime_ns)
+
+    assert "module_of" not in repo_data
+    assert repo_data["name"] == "foo"
+
+
+def test_yml_cache_keeps_data_as_parsed(tmp_path, monkeypatch):
+    """Test cached .yml data matches a fresh parse, whatever the path given."""
+    monkeypatch.setattr(
+        lastversion_module, "get_cache_dir", lambda: str(tmp_path / "cache")
+    )
+    specs_dir = tmp_path / "nginx-extras"
+    specs_dir.mkdir()
+    abs_repo = specs_dir / "foo.yml"
+    abs_repo.write_text("repo: foo/bar\n1: one\n", encoding="utf-8")
+    mtime_ns = abs_repo.stat().st_mtime_ns
+    read = lastversion_module.read_repo_data_from_yml
+
+    # the first read, from inside the directory, fills the disk cache
+    assert read("foo.yml", str(abs_repo), mtime_ns) == {
+        "repo": "foo/bar",
+        1: "one",
+        "name": "foo",
+    }
+    assert os.path.exists(lastversion_module.get_yml_cache_filename(str(abs_repo)))
+    assert read("nginx-extras/foo.yml", str(abs_repo), mtime_ns) == {
+        "repo": "foo/bar",
+        1: "one",
+        "module_of": "nginx",
+        "name": "nginx-module-foo",
+    }
+
+    # dates are not cached, but still come back as parsed
+    abs_repo = specs_dir / "bar.yml"
+    abs_repo.write_text("repo: foo/bar\nsince: 2024-01-02\n", encoding="utf-8")
+    for _ in range(2):
+        read.cache_clear()
+        repo_data = read("bar.yml", str(abs_repo), abs_repo.stat().st_mtime_ns)
+        assert repo_data["since"] == date(2024, 1, 2)
+    assert not os.path.exists(lastversion_module.get_yml_cache_filename(str(abs_repo)))
+
+
 def test_magento2_major():
     """Test major selection and returning version."""
     repo = "magento/magento2"
@@ -415,6 +533,100 @@ def test_last_b_belongs_to_version():
     assert not v.is_prerelease
 
 
+def test_make_version_reuses_instances():
+    """Test repeat tag strings are parsed once and char fix is cached apart."""
+    tag = "1.1.1b"
+    assert make_version(tag) is make_version(tag)
+    assert make_version(tag).is_prerelease
+    assert not make_version(tag, char_fix_required=True).is_prerelease
+
+
+def test_parse_version_is_cached():
+    """Test repeat version arguments are parsed once."""
+    assert parse_version("v1.2.3-beta1") is parse_version("v1.2.3-beta1")
+    assert parse_version("v1.2.3-beta1") == Version("1.2.3b1")
+    assert parse_version("mautic/mautic") is False
+
+
+def test_cache_ttl_sets_expiry_heuristic(monkeypatch):
+    """Test --cache-ttl makes cached responses fresh without revalidation."""
+    monkeypatch.setattr(TestProjectHolder, "CACHE_TTL", 3600)
+    adapter = TestProjectHolder().get_adapter("https://api.github.com")
+    assert adapter.heuristic is not None
+    monkeypatch.setattr(TestProjectHolder, "CACHE_TTL", 0)
+    adapter = TestProjectHolder().get_adapter("https://api.github.com")
+    assert adapter.heuristic is None
+
+
+@pytest.mark.skipif(
+    not SEPARATE_BODY_CACHE_AVAILABLE, reason="cachecontrol stores bodies inline"
+)
+def test_not_modified_refreshes_headers_only(tmp_path):
+    """Test a 304 makes the cached entry fresh again without rewriting its body."""
+    from cachecontrol.caches import SeparateBodyFileCache
+
+    cache = SeparateBodyFileCache(str(tmp_path))
+    controller = CacheController(cache)
+    request = requests.Request("GET", "https://api.github.com/repos/a/b").prepare()
+    cached = HTTPResponse(
+        body=io.BytesIO(b"[]"),
+        headers={
+            "ETag": '"x"',
+            "Cache-Control": "max-age=60",
+            "Date": "Tue, 02 Jan 2024 00:00:00 GMT",
+        },
+        status=200,
+        preload_content=False,
+    )
+    controller.cache_response(request, cached, b"[]")
+    assert not controller.cached_request(request)
+    cache.set_body = mock.Mock(wraps=cache.set_body)
+    date = formatdate(usegmt=True)
+    not_modified = HTTPResponse(headers={"ETag": '"x"', "Date": date}, status=304)
+    response = controller.update_cached_response(request, not_modified)
+    assert response.status == 200
+    assert response.read() == b"[]"
+    assert not cache.set_body.called
+    # the refreshed Date makes the entry fresh for max-age again
+    assert controller.cached_request(request).read() == b"[]"
+
+
+def test_has_update_accepts_version(monkeypatch):
+    """Test has_update() takes str or Version and validates it before lookup."""
+    monkeypatch.setattr(lastversion_module, "latest", lambda *a, **kw: Version("2.0"))
+    assert has_update("mautic/mautic", Version("1.0")) == Version("2.0")
+    assert has_update("mautic/mautic", "v2.0") is False
+    monkeypatch.setattr(lastversion_module, "latest", None)
+    with pytest.raises(version.InvalidVersion):
+        has_update("mautic/mautic", "foo")
+
+
+def test_sanitize_version_is_memoized():
+    """Test sanitized tags are reused until the holder's filters change."""
+    holder = TestProjectHolder()
+    v = holder.sanitize_version("v1.2.3", pre_ok=True)
+    assert holder.sanitize_version("v1.2.3", pre_ok=True) is v
+    holder.set_only("v2")
+    assert holder.sanitize_version("v1.2.3", pre_ok=True) is None
+
+
+def test_sanitize_version_memo_follows_repo():
+    """Test the project name prefix of the current repo is removed after a change."""
+    holder = TestProjectHolder()
+    assert holder.sanitize_version("libssh2-1.9.0") == Version("2.1.9.0")
+    holder.repo = "libssh2/libssh2"
+    assert holder.sanitize_version("libssh2-1.9.0") == Version("1.9.0")
+
+
+@pytest.mark.skipif(
+    not all("__slots__" in vars(cls) for cls in version.Version.__mro__[:-1]),
+    reason="packaging's Version has no __slots__",
+)
+def test_version_has_no_instance_dict():
+    """Test Version instances are slotted to stay small."""
+    assert not hasattr(Version("1.0"), "__dict__")
+
+
 def test_char_yml_direct():
     """Test URL with Chart.yaml."""
     repo = (
@@ -480,3 +692,208 @@ def test_dict_no_license():
     repo = "https://github.com/lastversion-test-repos/nginx_ajp_module"
     release = latest(repo, output_format="dict")
     assert release["version"] == version.parse("0.3.2")
+
+
+def test_is_outside_major_filter():
+    """Test only plain numeric versions are rejected before parsing."""
+    h = TestProjectHolder()
+    assert h.is_outside_major_filter("4.9.1", "5.1")
+    assert not h.is_outside_major_filter("5.1.2", "5.1")
+    assert not h.is_outside_major_filter("5.1", "5.1")
+    # these need parsing to be judged, e.g. 5.01 is 5.1
+    assert not h.is_outside_major_filter("5.01", "5.1")
+    assert not h.is_outside_major_filter("v4.9", "5.1")
+    assert not h.is_outside_major_filter("4.9.1", None)
+
+
+def test_parse_timestamp():
+    """Test API timestamps are parsed with a UTC offset, like dateutil does."""
+    ts = parse_timestamp("2023-01-31T10:00:00Z")
+    assert ts == datetime(2023, 1, 31, 10, tzinfo=timezone.utc)
+    assert parse_timestamp("2023-01-31T12:00:00+02:00") == ts
+    # non-ISO input is still understood
+    assert parse_timestamp("Tue, 31 Jan 2023 10:00:00 GMT") == ts
+
+
+def test_cache_adapter_is_shared(monkeypatch):
+    """Test holders share the caching adapter and do not close its pools."""
+    with TestProjectHolder() as first:
+        adapter = first.get_adapter("https://api.github.com")
+        monkeypatch.setattr(adapter, "close", mock.Mock())
+    second = TestProjectHolder()
+    assert second.get_adapter("https://api.github.com") is adapter
+    adapter.close.assert_not_called()
+
+
+def github_api_responses(releases, tags, commit_dates):
+    """Make a repo_query stand-in serving GitHub REST API data."""
+
+    def repo_query(uri):
+        status_code = 200
+        if uri == "/releases":
+            data = releases
+        elif uri.startswith("/releases/tags/"):
+            status_code, data = 404, {"message": "Not Found"}
+        elif uri.startswith("/tags"):
+            data = tags
+        else:
+            data = {"committer": {"date": commit_dates[uri.rsplit("/", 1)[1]]}}
+        response = mock.Mock(status_code=status_code, links={})
+        response.json.return_value = data
+        response.content = json.dumps(data).encode()
+        return response
+
+    return repo_query
+
+
+def test_github_tag_newer_than_formal_release_wins(monkeypatch):
+    """Test /tags are still checked when the formal release is not very recent."""
+    for var_name in GitHubRepoSession.TOKEN_ENV_VARS:
+        monkeypatch.delenv(var_name, raising=False)
+    now = datetime.now(timezone.utc)
+    release_date = (now - timedelta(days=60)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    tag_date = (now - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    project = GitHubRepoSession("foo/bar")
+    monkeypatch.setattr(project, "get_releases_feed_entries", lambda: None)
+    repo_query = github_api_responses(
+        releases=[
+            {"tag_name": "v1.0.0", "prerelease": False, "published_at": release_date}
+        ],
+        tags=[
+            {"name": "v1.1.0", "commit": {"sha": "b"}},
+            {"name": "v1.0.0", "commit": {"sha": "a"}},
+        ],
+        commit_dates={"a": release_date, "b": tag_date},
+    )
+    monkeypatch.setattr(project, "repo_query", repo_query)
+
+    release = project.get_latest()
+
+    assert release["version"] == Version("1.1.0")
+    assert release["type"] == "tag"
+
+
+def test_github_tags_request_each_commit_once(monkeypatch):
+    """Test /tags lookups request a commit date only when it is needed, once."""
+    for var_name in GitHubRepoSession.TOKEN_ENV_VARS:
+        monkeypatch.delenv(var_name, raising=False)
+    project = GitHubRepoSession("foo/bar")
+    project.formal_releases_by_tag = {}
+    repo_query = mock.Mock(
+        side_effect=github_api_responses(
+            releases=[],
+            tags=[
+                {"name": "v1.0.0", "commit": {"sha": "a"}},
+                {"name": "v1.1.0", "commit": {"sha": "b"}},
+                # the same release under another tag name
+                {"name": "1.1", "commit": {"sha": "b"}},
+                {"name": "v0.9.0", "commit": {"sha": "c"}},
+            ],
+            commit_dates={
+                "a": "2024-01-01T00:00:00Z",
+                "b": "2024-02-01T00:00:00Z",
+                "c": "2023-01-01T00:00:00Z",
+            },
+        )
+    )
+    monkeypatch.setattr(project, "repo_query", repo_query)
+
+    release = project.find_in_tags(None, False, None)
+
+    assert release["version"] == Version("1.1.0")
+    uris = [args[0] for args, _ in repo_query.call_args_list]
+    commit_uris = [uri for uri in uris if uri.startswith("/git/commits/")]
+    assert commit_uris == ["/git/commits/a", "/git/commits/b", "/git/commits/c"]
+
+
+@pytest.mark.parametrize("thorough, expected", [(False, "1.0.0"), (True, "1.1.0")])
+def test_github_thorough_looks_past_recent_release(monkeypatch, thorough, expected):
+    """Test --thorough checks /tags even when the formal release is recent."""
+    for var_name in GitHubRepoSession.TOKEN_ENV_VARS:
+        monkeypatch.delenv(var_name, raising=False)
+    now = datetime.now(timezone.utc)
+    release_date = (now - timedelta(days=10)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    tag_date = (now - timedelta(days=2)).strftime("%Y-%m-%dT%H:%M:%SZ")
+    project = GitHubRepoSession("foo/bar")
+    monkeypatch.setattr(project, "get_releases_feed_entries", lambda: None)
+    repo_query = github_api_responses(
+        releases=[
+            {"tag_name": "v1.0.0", "prerelease": False, "published_at": release_date}
+        ],
+        tags=[
+            {"name": "v1.1.0", "commit": {"sha": "b"}},
+            {"name": "v1.0.0", "commit": {"sha": "a"}},
+        ],
+        commit_dates={"a": release_date, "b": tag_date},
+    )
+    monkeypatch.setattr(project, "repo_query", repo_query)
+    project.set_thorough(thorough)
+
+    release = project.get_latest()
+
+    assert release["version"] == Version(expected)
+
+
+def test_http_adapter_is_shared(monkeypatch):
+    """Test holders share the plain adapter when the cache is disabled."""
+    monkeypatch.setattr(BaseProjectHolder, "CACHE_DISABLED", True)
+    with TestProjectHolder() as first:
+        adapter = first.get_adapter("https://api.github.com")
+        monkeypatch.setattr(adapter, "close", mock.Mock())
+    second = TestProjectHolder()
+    assert second.get_adapter("https://api.github.com") is adapter
+    adapter.close.assert_not_called()
+
+
+def test_foreign_os_extension_keeps_own_assets():
+    """Test only assets with another OS's extension are filtered out."""
+    if os.name == "nt":
+        kept, dropped = "tool-setup.msi", "tool.tgz"
+    else:
+        kept, dropped = "tool.tgz", "tool-setup.msi.sha256"
+    assert not asset_does_not_belong_to_machine(kept)
+    assert asset_does_not_belong_to_machine(dropped)
+    # an extension no OS claims is kept
+    assert not asset_does_not_belong_to_machine("tool.zip")
+
+
+def test_foreign_os_extension_is_filtered():
+    """Test assets with an extension meant for another OS are filtered out."""
+    assert asset_does_not_belong_to_machine("tool-setup.exe") is (os.name != "nt")
+    assert asset_does_not_belong_to_machine("tool.tar.gz") is (os.name == "nt")
+
+
+def test_latest_reuses_recent_result(monkeypatch):
+    """Test repeat latest() calls reuse the result, without sharing it."""
+    monkeypatch.setattr(lastversion_module, "latest_results", {})
+    monkeypatch.delenv("LASTVERSION_NO_MEMO", raising=False)
+    find = mock.Mock(return_value={"version": Version("1.2.3")})
+    monkeypatch.setattr(lastversion_module, "_latest", find)
+    first = latest("foo/bar", output_format="dict")
+    first["version"] = None
+    assert latest("foo/bar", output_format="dict") == {"version": Version("1.2.3")}
+    assert find.call_count == 1
+    monkeypatch.setenv("LASTVERSION_NO_MEMO", "1")
+    latest("foo/bar", output_format="dict")
+    assert find.call_count == 2
+
+
+def test_latest_not_reused_without_cache(monkeypatch):
+    """Test --no-cache also disables reuse of latest() results."""
+    monkeypatch.setattr(lastversion_module, "latest_results", {})
+    monkeypatch.delenv("LASTVERSION_NO_MEMO", raising=False)
+    monkeypatch.setattr(BaseProjectHolder, "CACHE_DISABLED", True)
+    find = mock.Mock(return_value=Version("1.2.3"))
+    monkeypatch.setattr(lastversion_module, "_latest", find)
+    latest("foo/bar")
+    latest("foo/bar")
+    assert find.call_count == 2
+
+
+def test_host_repo_for_link_ignores_query():
+    """Test project links keep only the project path of the URL."""
+    link = "https://github.com/dvershinin/lastversion?tab=readme-ov-file#readme"
+    assert GitHubRepoSession.get_host_repo_for_link(link) == (
+        "github.com",
+        "dvershinin/lastversion",
+    )